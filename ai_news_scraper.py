@@ -1,10 +1,21 @@
-import requests
-import xml.etree.ElementTree as ET
-from bs4 import BeautifulSoup
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import timedelta
+import html
+import os
 import time
 import logging
 import re
+from http_client import FeedHTTPClient
+from feed_parser import iter_feed_entries
+from keyword_matcher import KeywordMatcher
+from html_cleaner import HTMLCleaner
+from date_utils import parse_datetime, utc_now
+from dedup_index import DedupIndex
+from source_health import SourceHealth
+from metrics import (
+    ARTICLES_DEDUPED, ARTICLES_FILTERED, FETCH_BYTES, FETCH_ERRORS,
+    FETCH_ITEMS, FETCH_RETRIES, FETCH_SECONDS, FETCH_SKIPPED, STAGE_SECONDS, span
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -19,191 +30,400 @@ class AINewsScraper:
             'wired_ai': 'https://www.wired.com/feed/tag/ai/latest/rss',
             'mit_tech_review': 'https://www.technologyreview.com/feed/',
         }
-        self.seen_articles = set()
+        
+        # Articles already delivered, per delivery channel, kept for a
+        # bounded retention window and persisted across restarts
+        data_dir = os.getenv('BOT_DATA_DIR', 'data')
+        self.dedup = DedupIndex(
+            path=os.path.join(data_dir, 'dedup_index.bin'),
+            retention_hours=float(os.getenv('DEDUP_RETENTION_HOURS', '168'))
+        )
+        
+        # Concurrent fetching: each source gets its own deadline and the whole
+        # run is bounded by an overall deadline
+        self.max_workers = int(os.getenv('FETCH_MAX_WORKERS', '16'))
+        self.source_timeout = float(os.getenv('FETCH_SOURCE_TIMEOUT', '15'))
+        self.overall_timeout = float(os.getenv('FETCH_OVERALL_TIMEOUT', '30'))
+        self._executor = None
+        
+        # Per-source health: timeouts follow each source's own latency
+        # (FETCH_SOURCE_TIMEOUT is the ceiling), failed attempts are retried
+        # up to FETCH_RETRIES times, and a source failing CIRCUIT_FAILURES
+        # attempts in a row is skipped for CIRCUIT_BACKOFF seconds (doubling)
+        self.min_timeout = float(os.getenv('FETCH_MIN_TIMEOUT', '2'))
+        self.max_retries = int(os.getenv('FETCH_RETRIES', '2'))
+        self.circuit_failures = int(os.getenv('CIRCUIT_FAILURES', '3'))
+        self.circuit_backoff = float(os.getenv('CIRCUIT_BACKOFF', '60'))
+        self.health = {}  # source name -> SourceHealth
+        # Fetch runs start with the sources attempted longest ago, so when a
+        # large source list can't all be fetched before the deadline the
+        # same tail isn't left out every time
+        self.last_attempted = {}  # source name -> monotonic time
+        
+        # Pooled connections plus validator caching: unchanged feeds come
+        # back as 304 and are served from the last parse
+        self.http = FeedHTTPClient(pool_maxsize=self.max_workers)
+        self.feed_cache = {}  # url -> {'hours', 'entries'} from the last parse
+        
+        # Consecutive out-of-window items tolerated before a newest-first
+        # feed is assumed to have nothing recent left
+        self.stale_limit = 3
+        
+        # Keyword lists can be overridden with a JSON file of
+        # {"include": [...], "exclude": [...]}
+        keywords_file = os.getenv('AI_KEYWORDS_FILE')
+        if keywords_file:
+            self.keyword_matcher = KeywordMatcher.from_file(keywords_file)
+        else:
+            self.keyword_matcher = KeywordMatcher()
+        
+        # Summaries repeat across polling cycles, so cleaning is memoized
+        self.html_cleaner = HTMLCleaner()
+    
+    def _get_executor(self):
+        """Return the shared fetch thread pool, creating it on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='feed-fetch'
+            )
+        return self._executor
     
-    def fetch_rss_feed(self, url):
-        """Fetch and parse RSS feed"""
+    def source_health(self, source_name):
+        """Health record of a source, created on first use"""
+        health = self.health.get(source_name)
+        if health is None:
+            health = self.health.setdefault(source_name, SourceHealth(
+                min_timeout=self.min_timeout,
+                max_timeout=self.source_timeout,
+                failure_threshold=self.circuit_failures,
+                base_backoff=self.circuit_backoff
+            ))
+        return health
+    
+    def fetch_rss_feed(self, url, timeout=None, hours=None, source=None):
+        """Fetch and parse RSS feed; errors are logged and give an empty list"""
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'application/rss+xml, application/xml, text/xml, */*',
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            }
-            response = requests.get(url, headers=headers, timeout=15)
+            return self._fetch_feed(url, timeout, hours, source or url)
+        except Exception as e:
+            FETCH_ERRORS.inc(source=source or url)
+            logger.error(f"Error fetching RSS from {url}: {e}")
+            return []
+    
+    def _fetch_feed(self, url, timeout, hours, source):
+        """``fetch_rss_feed`` without the error handling"""
+        timeout = timeout or self.source_timeout
+        started = time.perf_counter()
+        deadline = time.monotonic() + timeout
+        # A cached parse can only answer a 304 if it covered at least
+        # the window being asked for now
+        cached = self.feed_cache.get(url)
+        conditional = cached is not None and (
+            cached['hours'] is None or (hours is not None and cached['hours'] >= hours)
+        )
+        response = self.http.get(url, timeout=timeout, stream=True, conditional=conditional)
+        # Stream responses are closed on every path, errors included,
+        # so their pooled connections are released
+        with response:
+            if response.status_code == 304:
+                # Feed unchanged since last fetch: reuse the parsed entries
+                self.http.record('cache_hits')
+                FETCH_SECONDS.observe(time.perf_counter() - started, source=source)
+                FETCH_BYTES.observe(0, source=source)
+                FETCH_ITEMS.observe(len(cached['entries']), source=source)
+                return list(cached['entries'])
             response.raise_for_status()
             
-            # Parse XML
-            root = ET.fromstring(response.content)
-            entries = []
+            received = [0]
             
-            # Handle both RSS and Atom feeds
-            items = root.findall('.//item') or root.findall('.//{http://www.w3.org/2005/Atom}entry')
+            def read_chunks():
+                # Read the body against the per-source deadline so a slow
+                # feed can't hold its worker past its budget
+                for chunk in response.iter_content(chunk_size=16384):
+                    received[0] += len(chunk)
+                    yield chunk
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"deadline of {timeout}s exceeded")
             
-            for item in items:
-                entry = {}
-                
-                # Get title
-                title_elem = item.find('title') or item.find('.//{http://www.w3.org/2005/Atom}title')
-                entry['title'] = title_elem.text if title_elem is not None else ''
-                
-                # Get link
-                link_elem = item.find('link') or item.find('.//{http://www.w3.org/2005/Atom}link')
-                if link_elem is not None:
-                    entry['link'] = link_elem.text if link_elem.text else link_elem.get('href', '')
-                else:
-                    entry['link'] = ''
-                
-                # Get description/summary
-                desc_elem = (item.find('description') or 
-                           item.find('.//{http://www.w3.org/2005/Atom}summary') or
-                           item.find('.//{http://www.w3.org/2005/Atom}content'))
-                if desc_elem is not None:
-                    # Clean HTML from summary
-                    summary_text = desc_elem.text if desc_elem.text else ''
-                    entry['summary'] = self.clean_html_content(summary_text)
-                else:
-                    entry['summary'] = ''
-                
-                # Get published date
-                pub_elem = (item.find('pubDate') or 
-                          item.find('.//{http://www.w3.org/2005/Atom}published') or
-                          item.find('.//{http://www.w3.org/2005/Atom}updated'))
-                entry['published'] = pub_elem.text if pub_elem is not None else ''
+            entries = []
+            stale = 0
+            # With ``hours``, reading stops at the first run of out-of-window
+            # items, so only the recent part of a large feed is downloaded
+            for entry in iter_feed_entries(read_chunks()):
+                # Dates are normalized to aware UTC once, at ingest
+                entry['published_at'] = parse_datetime(entry['published'])
+                if hours is not None and not self.is_recent(entry['published_at'], hours):
+                    stale += 1
+                    if stale >= self.stale_limit:
+                        break  # Everything further down is older still
+                    continue
+                stale = 0
                 
+                # Clean HTML from summary
+                entry['summary'] = self.clean_html_content(entry['summary'])
                 entries.append(entry)
-            
-            return entries
-            
-        except Exception as e:
-            logger.error(f"Error fetching RSS from {url}: {e}")
-            return []
+        
+        # Only trust validators once the body parsed cleanly
+        self.http.store_validators(url, response, received[0])
+        self.feed_cache[url] = {'hours': hours, 'entries': entries}
+        FETCH_SECONDS.observe(time.perf_counter() - started, source=source)
+        FETCH_BYTES.observe(received[0], source=source)
+        FETCH_ITEMS.observe(len(entries), source=source)
+        return list(entries)
+    
+    def get_fetch_stats(self):
+        """Return HTTP cache counters (requests, 304s, cache hits, bytes saved)"""
+        return self.http.get_stats()
+    
+    def snapshot(self):
+        """Validators, the parses they vouch for and fetch latencies, for a warm restart"""
+        return {
+            'validators': self.http.snapshot(),
+            'feed_cache': dict(self.feed_cache),
+            'latencies': {name: list(health.latencies) for name, health in self.health.items()},
+        }
+    
+    def restore(self, state):
+        # Parses first: a validator without one can't answer a 304
+        for url, cached in state['feed_cache'].items():
+            self.feed_cache.setdefault(url, cached)
+        self.http.restore(state['validators'])
+        for source_name, latencies in state.get('latencies', {}).items():
+            for seconds in latencies:
+                self.source_health(source_name).observe_latency(seconds)
     
     def is_recent(self, published_date, hours=24):
-        """Check if article is from last N hours"""
-        try:
-            if isinstance(published_date, str):
-                # Try to parse common date formats
-                from dateutil import parser
-                pub_time = parser.parse(published_date)
-            else:
-                return True  # If we can't parse date, include it
-            
-            cutoff = datetime.now() - timedelta(hours=hours)
-            return pub_time.replace(tzinfo=None) > cutoff
-        except:
+        """Check if article is from last N hours
+        
+        Accepts an aware datetime or a date string. Articles whose date
+        can't be parsed are included.
+        """
+        if isinstance(published_date, str):
+            published_date = parse_datetime(published_date)
+        if published_date is None:
             return True  # If we can't parse date, include it
+        
+        return published_date > utc_now() - timedelta(hours=hours)
     
     def extract_ai_keywords(self, text):
-        """Check if content contains AI product/release keywords"""
-        # Focus on actual AI product releases and company announcements
-        ai_product_keywords = [
-            # Company releases
-            'openai', 'anthropic', 'google ai', 'microsoft ai', 'meta ai', 'nvidia ai',
-            'chatgpt', 'claude', 'gemini', 'copilot', 'bard', 'llama',
-            
-            # Product releases
-            'releases', 'launches', 'announces', 'unveils', 'introduces',
-            'new model', 'ai model', 'language model', 'llm',
-            
-            # Specific AI products/agents
-            'ai agent', 'ai assistant', 'chatbot', 'voice assistant',
-            'gpt-4', 'gpt-5', 'claude-3', 'gemini pro', 'dall-e', 'midjourney',
+        """Check if content contains AI product/release keywords
+        
+        Returns the sorted list of matched product keywords, or an empty list
+        when nothing matched or the text looks academic.
+        """
+        included, excluded = self.keyword_matcher.find(text)
+        
+        # Must contain AI product keywords and must not be academic content
+        if not included or excluded:
+            return []
+        return sorted(included)
+    
+    def fetch_source(self, source_name, url, hours=24, timeout=None):
+        """Fetch one source and return its recent AI-related entries
+        
+        Makes a single attempt and raises if the fetch fails; retries are
+        up to the caller. Successful fetch times feed the source's health.
+        """
+        logger.info(f"Fetching from {source_name}...")
+        started = time.monotonic()
+        entries = self._fetch_feed(url, timeout, hours, source_name)
+        self.source_health(source_name).observe_latency(time.monotonic() - started)
+        
+        matched = []
+        stale = unrelated = 0
+        with span('filter'):
+            for entry in entries:
+                try:
+                    # Check if article is recent
+                    if not self.is_recent(entry.get('published_at'), hours):
+                        stale += 1
+                        continue
+                    
+                    # Check if content is AI-related
+                    content = f"{entry.get('title', '')} {entry.get('summary', '')}"
+                    keywords = self.extract_ai_keywords(content)
+                    if not keywords:
+                        unrelated += 1
+                        continue
+                    entry['keywords'] = keywords
+                    
+                    matched.append(entry)
+                except Exception as e:
+                    logger.error(f"Error processing entry from {source_name}: {e}")
+                    continue
+        
+        if stale:
+            ARTICLES_FILTERED.inc(stale, source=source_name, reason='stale')
+        if unrelated:
+            ARTICLES_FILTERED.inc(unrelated, source=source_name, reason='no_keywords')
+        return matched
+    
+    def fetch_all_sources(self, hours=24, sources=None, overall_timeout=None):
+        """Fetch all sources in parallel; returns {source name: entries} for those done in time"""
+        sources = sources if sources is not None else self.sources
+        overall_timeout = overall_timeout or self.overall_timeout
+        started = time.monotonic()
+        deadline = started + overall_timeout
+        
+        executor = self._get_executor()
+        pending = {}     # future -> (source name, submitted at)
+        in_flight = {}   # source name -> number of pending futures
+        attempts = {}    # source name -> attempts made
+        hedged = set()
+        retry_at = {}    # source name -> monotonic time of its next attempt
+        running_since = {}  # source name -> when a worker first picked it up
+        results = {}
+        
+        def run(source_name, attempt_timeout):
+            self.last_attempted[source_name] = time.monotonic()
+            running_since.setdefault(source_name, self.last_attempted[source_name])
+            return self.fetch_source(source_name, sources[source_name], hours, attempt_timeout)
+        
+        def submit(source_name, now, attempt_timeout):
+            future = executor.submit(run, source_name, attempt_timeout)
+            pending[future] = (source_name, now)
+            in_flight[source_name] = in_flight.get(source_name, 0) + 1
+        
+        def attempt(source_name, now):
+            # Open circuits are skipped without a request; each attempt gets
+            # the source's adaptive timeout
+            if not self.source_health(source_name).allow(now):
+                FETCH_SKIPPED.inc(source=source_name)
+                logger.info(f"Skipping {source_name}: circuit open after repeated failures")
+                return
+            count = attempts.get(source_name, 0)
+            attempts[source_name] = count + 1
+            submit(source_name, now, self.source_health(source_name).timeout(count))
+        
+        for source_name in sorted(sources, key=lambda name: self.last_attempted.get(name, 0.0)):
+            attempt(source_name, started)
+        
+        while pending or retry_at:
+            now = time.monotonic()
+            if now >= deadline:
+                break
             
-            # AI capabilities
-            'multimodal', 'text-to-image', 'text-to-video', 'code generation',
-            'reasoning', 'function calling', 'tool use',
+            for source_name, when in list(retry_at.items()):
+                if when <= now:
+                    del retry_at[source_name]
+                    FETCH_RETRIES.inc(source=source_name, kind='retry')
+                    attempt(source_name, now)
             
-            # Business/funding
-            'funding', 'investment', 'valuation', 'startup', 'acquisition',
-            'partnership', 'collaboration',
+            # Hedge slow fetches once, if the source has a latency record:
+            # past its p95 a second request goes out and the first answer wins
+            wake = [deadline] + list(retry_at.values())
+            for future, (source_name, submitted) in list(pending.items()):
+                if source_name in hedged:
+                    continue
+                hedge_after = self.source_health(source_name).hedge_delay()
+                if hedge_after is None:
+                    continue
+                if now - submitted >= hedge_after:
+                    hedged.add(source_name)
+                    FETCH_RETRIES.inc(source=source_name, kind='hedge')
+                    submit(source_name, now, self.source_health(source_name).timeout(1))
+                else:
+                    wake.append(submitted + hedge_after)
             
-            # Avoid academic terms
-        ]
-        
-        # Exclude academic/research terms
-        exclude_keywords = [
-            'paper', 'research', 'study', 'arxiv', 'conference',
-            'journal', 'publication', 'dataset', 'benchmark'
-        ]
-        
-        text_lower = text.lower()
+            if not pending:
+                time.sleep(max(0.0, min(wake) - now))
+                continue
+            done, _ = wait(pending, timeout=max(0.0, min(wake) - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                source_name, _ = pending.pop(future)
+                in_flight[source_name] -= 1
+                if source_name in results:
+                    continue  # A hedge already won
+                health = self.source_health(source_name)
+                try:
+                    results[source_name] = future.result()
+                    health.record_success()
+                except Exception as e:
+                    FETCH_ERRORS.inc(source=source_name)
+                    opened = health.record_failure(time.monotonic())
+                    if in_flight[source_name]:
+                        continue  # Its hedge may still succeed
+                    if opened:
+                        logger.error(f"Error fetching {source_name}: {e}; skipping it for {health.backoff:.0f}s")
+                    elif attempts[source_name] <= self.max_retries:
+                        # Scheduled here, not slept in a worker, so other
+                        # sources carry on during the backoff
+                        delay = health.retry_delay(attempts[source_name])
+                        logger.warning(f"Error fetching {source_name}: {e}; retrying in {delay:.1f}s")
+                        retry_at[source_name] = time.monotonic() + delay
+                    else:
+                        logger.error(f"Failed to fetch {source_name} after {attempts[source_name]} attempts: {e}")
         
-        # Must contain AI product keywords
-        has_ai_keywords = any(keyword in text_lower for keyword in ai_product_keywords)
+        attempted = set()
+        queued = set()
+        for future, (source_name, _) in pending.items():
+            # Stragglers finish on their own per-source deadline; their
+            # results are simply dropped. A fetch still queued behind a full
+            # pool never sent a request, so it says nothing about the source
+            if future.cancel():
+                queued.add(source_name)
+            else:
+                attempted.add(source_name)
+        now = time.monotonic()
+        for source_name in sorted(attempted - results.keys()):
+            # Only a fetch running past the source's usual latency is its
+            # fault; one that just got a worker was cut short by the others
+            health = self.source_health(source_name)
+            if now - running_since.get(source_name, now) >= (health.hedge_delay() or health.min_timeout):
+                health.record_failure(now)
+                logger.warning(f"Skipping {source_name}: missed the {overall_timeout}s deadline")
+            else:
+                logger.warning(f"Skipping {source_name}: started too close to the {overall_timeout}s deadline")
+        for source_name in sorted(queued - attempted - results.keys()):
+            logger.warning(f"Skipping {source_name}: not attempted before the {overall_timeout}s deadline")
         
-        # Must not be academic content
-        is_academic = any(keyword in text_lower for keyword in exclude_keywords)
+        STAGE_SECONDS.observe(time.monotonic() - started, stage='fetch')
+        return results
+    
+    def normalize_entry(self, entry, source_name):
+        """Turn a parsed feed entry into an article dict"""
+        # Clean and limit summary
+        summary = entry.get('summary', '')
+        if len(summary) > 300:
+            summary = summary[:300].rsplit(' ', 1)[0] + '...'
         
-        return has_ai_keywords and not is_academic
+        return {
+            'title': entry.get('title', 'No title'),
+            'link': entry.get('link', ''),
+            'summary': summary,
+            'source': source_name,
+            'published': entry.get('published', 'Unknown date'),
+            'published_at': entry.get('published_at'),
+            'keywords': entry.get('keywords', [])
+        }
     
     def get_latest_news(self, hours=24):
-        """Get latest AI news from all sources"""
+        """Get the 10 latest AI news articles from all sources"""
         all_articles = []
+        batch_ids = set()
         
         try:
-            for source_name, url in self.sources.items():
-                logger.info(f"Fetching from {source_name}...")
-                try:
-                    # Add retry mechanism
-                    entries = None
-                    for attempt in range(3):
-                        try:
-                            entries = self.fetch_rss_feed(url)
-                            break
-                        except Exception as e:
-                            if attempt == 2:  # Last attempt
-                                logger.error(f"Failed to fetch {source_name} after 3 attempts: {e}")
-                                entries = []
-                            else:
-                                time.sleep(2)  # Wait before retry
-                    
-                    # Ensure entries is iterable
-                    if not entries or not isinstance(entries, list):
-                        continue
-                        
-                    for entry in entries:
-                        try:
-                            # Check if article is recent
-                            if entry.get('published') and not self.is_recent(entry.get('published'), hours):
-                                continue
-                            
-                            # Check if content is AI-related
-                            content = f"{entry.get('title', '')} {entry.get('summary', '')}"
-                            if not self.extract_ai_keywords(content):
-                                continue
-                            
-                            # Avoid duplicates
-                            article_id = entry.get('link', entry.get('title', ''))
-                            if article_id in self.seen_articles:
-                                continue
-                            
-                            self.seen_articles.add(article_id)
-                            
-                            # Clean and limit summary
-                            summary = entry.get('summary', '')
-                            if len(summary) > 300:
-                                summary = summary[:300].rsplit(' ', 1)[0] + '...'
-                            
-                            article = {
-                                'title': entry.get('title', 'No title'),
-                                'link': entry.get('link', ''),
-                                'summary': summary,
-                                'source': source_name,
-                                'published': entry.get('published', 'Unknown date')
-                            }
-                            
-                            all_articles.append(article)
-                        except Exception as e:
-                            logger.error(f"Error processing entry from {source_name}: {e}")
+            results = self.fetch_all_sources(hours)
+            
+            # Walk results in source order so output stays deterministic
+            for source_name in self.sources:
+                for entry in results.get(source_name, []):
+                    try:
+                        # Avoid duplicates across sources within this run
+                        article_id = entry.get('link') or entry.get('title', '')
+                        if article_id in batch_ids:
+                            ARTICLES_DEDUPED.inc(reason='batch')
                             continue
-                            
-                except Exception as e:
-                    logger.error(f"Error fetching from {source_name}: {e}")
-                    continue
+                        
+                        batch_ids.add(article_id)
+                        all_articles.append(self.normalize_entry(entry, source_name))
+                    except Exception as e:
+                        logger.error(f"Error processing entry from {source_name}: {e}")
+                        continue
             
+            # Newest first; undated entries count as just seen
+            now = utc_now()
+            all_articles.sort(key=lambda article: article.get('published_at') or now, reverse=True)
             return all_articles[:10]  # Return top 10 most recent
             
         except Exception as e:
@@ -214,7 +434,7 @@ class AINewsScraper:
         """Format article for Telegram message using HTML"""
         # Clean title and summary for HTML
         title = self.clean_html_text(article.get('title', 'No title'))
-        summary = self.clean_html_text(article.get('summary', ''))
+        summary = self.clean_html_content(article.get('summary', ''))
         
         # Format source name nicely
         source_name = article.get('source', 'Unknown').replace('_', ' ').title()
@@ -222,27 +442,33 @@ class AINewsScraper:
         message = f"🤖 <b>{title}</b>\n\n"
         message += f"📰 <i>{source_name}</i>\n"
         
+        # Same story from other outlets, folded in by the story clusterer
+        alternates = article.get('alternates') or []
+        if alternates:
+            links = ', '.join(
+                f"<a href=\"{html.escape(alternate.get('link', ''))}\">"
+                f"{html.escape(alternate.get('source', 'Unknown').replace('_', ' ').title())}</a>"
+                for alternate in alternates
+            )
+            message += f"🔁 Also on: {links}\n"
+        
         # Format date nicely
         pub_date = article.get('published', 'Unknown date')
-        if pub_date != 'Unknown date':
-            try:
-                from dateutil import parser
-                parsed_date = parser.parse(pub_date)
-                formatted_date = parsed_date.strftime('%B %d, %Y at %I:%M %p')
-                message += f"📅 {formatted_date}\n\n"
-            except:
-                message += f"📅 {pub_date}\n\n"
+        published_at = article.get('published_at') or parse_datetime(pub_date)
+        if published_at is not None:
+            formatted_date = published_at.strftime('%B %d, %Y at %I:%M %p UTC')
+            message += f"📅 {formatted_date}\n\n"
         else:
             message += f"📅 {pub_date}\n\n"
         
         # Only add summary if it exists and is meaningful
         if summary and len(summary.strip()) > 10:
-            # Limit summary length
+            # Limit summary length; cut before escaping so no entity is split
             if len(summary) > 200:
                 summary = summary[:200] + "..."
-            message += f"📝 {summary}\n\n"
+            message += f"📝 {self.escape_html_text(summary)}\n\n"
         
-        message += f"🔗 <a href=\"{article.get('link', '')}\">Read Full Article</a>"
+        message += f"🔗 <a href=\"{html.escape(article.get('link', ''))}\">Read Full Article</a>"
         
         return message
     
@@ -251,32 +477,19 @@ class AINewsScraper:
         if not text:
             return ""
         
-        # Use BeautifulSoup to remove HTML tags
-        soup = BeautifulSoup(text, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style", "figure", "img"]):
-            script.decompose()
-        
-        # Get text and clean it
-        clean_text = soup.get_text()
-        
-        # Clean up whitespace
-        lines = (line.strip() for line in clean_text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        clean_text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        return clean_text
+        return self.html_cleaner.clean(text)
     
     def clean_html_text(self, text):
         """Clean text for Telegram HTML formatting"""
         if not text:
             return ""
         
-        # First clean HTML content
-        text = self.clean_html_content(text)
-        
-        # Escape HTML special characters for Telegram
+        # Strip HTML first, then escape what's left for Telegram
+        return self.escape_html_text(self.clean_html_content(text))
+    
+    @staticmethod
+    def escape_html_text(text):
+        """Escape plain text for Telegram HTML formatting"""
         text = text.replace('&', '&amp;')
         text = text.replace('<', '&lt;')
         text = text.replace('>', '&gt;')
@@ -0,0 +1,246 @@
+from bisect import bisect_left, insort
+from datetime import timedelta
+import itertools
+import logging
+import threading
+from date_utils import utc_now
+from story_clusters import StoryClusterer
+from metrics import ARTICLES_DEDUPED
+
+logger = logging.getLogger(__name__)
+
+
+def article_key(article):
+    """Identity of an article: its link, falling back to its title"""
+    return article.get('link') or article.get('title', '')
+
+
+def article_time(article):
+    """When an article happened: its publish date, else when we first saw it"""
+    return article.get('published_at') or article.get('first_seen')
+
+
+def article_relevance(article):
+    """Ranking score: how many AI product keywords the article matched"""
+    return len(article.get('keywords') or ())
+
+
+class ArticleStore:
+    """Shared store of normalized articles, indexed by publish time
+
+    Articles are kept in a list sorted by UTC timestamp and maintained
+    incrementally with bisect, so "the last N hours" is a binary search plus
+    a slice rather than a scan of everything stored. Articles older than
+    ``retention_hours`` fall off the front on insert.
+
+    Near-duplicate stories from different outlets are folded into the first
+    one seen: only that representative is indexed, and the others are listed
+    on it under ``alternates``, their keywords merged into its own. A story
+    only joins a representative from another source published within
+    ``cluster_window_hours`` of it; a source's follow-up (Series F after
+    Series E) is news of its own.
+
+    Relevance is a small integer (the keyword count), so entries are also
+    kept in one time-sorted list per relevance: the top articles of a window
+    are a binary search into each list, read newest first from the highest
+    relevance down.
+    """
+
+    def __init__(self, retention_hours=168, clusterer=None, cluster_window_hours=48):
+        self.retention = timedelta(hours=retention_hours)
+        self.cluster_window = timedelta(hours=cluster_window_hours)
+        self.clusterer = clusterer if clusterer is not None else StoryClusterer()
+        self._articles = {}  # key -> article
+        self._duplicates = {}  # duplicate key -> representative key
+        self._members = {}     # representative key -> duplicate keys
+        self._order = []     # sorted (timestamp, seq, key)
+        self._entries = {}   # key -> its (timestamp, seq, key) entry
+        self._by_relevance = {}  # relevance -> sorted entries with that relevance
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._articles)
+
+    def __contains__(self, key):
+        """Whether ``key`` is a stored article (not a folded-in duplicate)"""
+        return key in self._articles
+
+    def add(self, articles):
+        """Insert articles and return the ones that were not stored yet"""
+        now = utc_now()
+        new_articles = []
+        with self._lock:
+            for article in articles:
+                key = article_key(article)
+                if not key or key in self._articles or key in self._duplicates:
+                    continue
+                article.setdefault('first_seen', now)
+                
+                text = f"{article.get('title', '')} {article.get('summary', '')}"
+                cluster_key = self.clusterer.assign(
+                    key, text, headline=article.get('title', ''),
+                    accept=lambda candidate: self._may_join(article, self._articles[candidate])
+                )
+                if cluster_key != key:
+                    representative = self._articles[cluster_key]
+                    representative.setdefault('alternates', []).append({
+                        'source': article.get('source', ''),
+                        'link': article.get('link', '')
+                    })
+                    keywords = representative.get('keywords') or []
+                    representative['keywords'] = keywords + [
+                        keyword for keyword in article.get('keywords') or () if keyword not in keywords
+                    ]
+                    self._rerank(cluster_key, len(keywords))
+                    self._duplicates[key] = cluster_key
+                    self._members.setdefault(cluster_key, []).append(key)
+                    ARTICLES_DEDUPED.inc(reason='cluster')
+                    new_articles.append(article)
+                    continue
+                
+                self._articles[key] = article
+                entry = (article_time(article).timestamp(), next(self._seq), key)
+                insort(self._order, entry)
+                self._entries[key] = entry
+                insort(self._by_relevance.setdefault(article_relevance(article), []), entry)
+                new_articles.append(article)
+            self._prune(now)
+        return new_articles
+
+    def _rerank(self, key, old_relevance):
+        """Move ``key``'s entry to the list of its current relevance"""
+        relevance = article_relevance(self._articles[key])
+        if relevance == old_relevance:
+            return
+        entry = self._entries[key]
+        entries = self._by_relevance[old_relevance]
+        del entries[bisect_left(entries, entry)]
+        if not entries:
+            del self._by_relevance[old_relevance]
+        insort(self._by_relevance.setdefault(relevance, []), entry)
+
+    def update(self, key, change):
+        """Call ``change`` on a stored article under the store's lock
+
+        For changes made after insertion (enrichment), so a concurrent
+        ``snapshot`` never copies an article half-updated. Returns False if
+        the article is no longer stored.
+        """
+        with self._lock:
+            article = self._articles.get(key)
+            if article is None:
+                return False
+            change(article)
+            return True
+
+    def _may_join(self, article, representative):
+        """Whether ``article`` may be folded into ``representative``'s cluster"""
+        if article.get('source_id') == representative.get('source_id'):
+            return False
+        return abs(article_time(article) - article_time(representative)) <= self.cluster_window
+
+    def _prune(self, now):
+        expired = ((now - self.retention).timestamp(),)
+        cutoff = bisect_left(self._order, expired)
+        if cutoff:
+            for _, _, key in self._order[:cutoff]:
+                del self._articles[key]
+                del self._entries[key]
+                self.clusterer.remove(key)
+                for duplicate in self._members.pop(key, ()):
+                    del self._duplicates[duplicate]
+            del self._order[:cutoff]
+            for relevance, entries in list(self._by_relevance.items()):
+                del entries[:bisect_left(entries, expired)]
+                if not entries:
+                    del self._by_relevance[relevance]
+
+    def snapshot(self):
+        """Picklable copy of the store's contents
+
+        Articles (and their lists) are copied, so the snapshot can be pickled
+        outside the lock while they keep changing.
+        """
+        with self._lock:
+            return {
+                'articles': {
+                    key: {field: list(value) if isinstance(value, list) else value for field, value in article.items()}
+                    for key, article in self._articles.items()
+                },
+                'duplicates': dict(self._duplicates),
+                'members': {key: list(keys) for key, keys in self._members.items()},
+                'order': list(self._order),
+                'clusters': self.clusterer.snapshot(),
+            }
+
+    def restore(self, state):
+        """Replace the contents with a snapshot, dropping what has expired
+
+        Returns False if the snapshot's clusters don't fit this store's
+        clusterer, in which case nothing is restored.
+        """
+        with self._lock:
+            if not self.clusterer.restore(state['clusters']):
+                return False
+            self._articles = state['articles']
+            self._duplicates = state['duplicates']
+            self._members = state['members']
+            self._order = state['order']
+            self._seq = itertools.count(max((seq for _, seq, _ in self._order), default=-1) + 1)
+            self._entries = {}
+            self._by_relevance = {}
+            for entry in self._order:
+                self._entries[entry[2]] = entry
+                self._by_relevance.setdefault(article_relevance(self._articles[entry[2]]), []).append(entry)
+            self._prune(utc_now())
+        return True
+
+    def _window_start(self, hours):
+        return bisect_left(self._order, self._since(hours))
+
+    @staticmethod
+    def _since(hours):
+        return ((utc_now() - timedelta(hours=hours)).timestamp(),)
+
+    def recent(self, hours, limit=None, source_ids=None):
+        """Articles from the last ``hours`` hours, newest first
+
+        Walks backwards from the newest entry, so the cost is the binary
+        search plus the number of articles returned (and skipped by
+        ``source_ids``).
+        """
+        with self._lock:
+            start = self._window_start(hours)
+            matches = []
+            for index in range(len(self._order) - 1, start - 1, -1):
+                article = self._articles[self._order[index][2]]
+                if source_ids is not None and article.get('source_id') not in source_ids:
+                    continue
+                matches.append(article)
+                if limit is not None and len(matches) >= limit:
+                    break
+        return matches
+
+    def most_relevant(self, hours, limit=None, source_ids=None):
+        """Top ``limit`` articles of the last ``hours`` hours by relevance
+
+        Ties go to the more recent article. Without ``limit``, the whole
+        window is returned in that order. Nothing is sorted: the cost is a
+        binary search per relevance level plus the articles returned (and
+        skipped by ``source_ids``).
+        """
+        since = self._since(hours)
+        with self._lock:
+            matches = []
+            for relevance in sorted(self._by_relevance, reverse=True):
+                entries = self._by_relevance[relevance]
+                start = bisect_left(entries, since)
+                for index in range(len(entries) - 1, start - 1, -1):
+                    article = self._articles[entries[index][2]]
+                    if source_ids is not None and article.get('source_id') not in source_ids:
+                        continue
+                    matches.append(article)
+                    if limit is not None and len(matches) >= limit:
+                        return matches
+        return matches
@@ -0,0 +1,297 @@
+"""Benchmark fixture corpus: loading, synthetic generation and local serving
+
+A corpus is a directory holding ``manifest.json`` plus the recorded bodies.
+The manifest maps every feed source and company source to its file:
+
+    {
+      "recorded_at": "2026-10-17T09:00:00+00:00",
+      "synthetic": false,
+      "feeds": {"techcrunch_ai": {"file": "feeds/techcrunch_ai.xml", "url": "..."}},
+      "company": {"openai_blog": {"kind": "feed", "file": "company/openai_blog.xml", "url": "..."}}
+    }
+
+``kind`` is one of 'feed', 'sitemap' or 'page', the strategy the company
+scraper would use for that site. ``recorded_at`` is replayed as "now" so
+date windows see the corpus as fresh.
+"""
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import hashlib
+import html
+import json
+import os
+import random
+import sys
+import threading
+
+MANIFEST = 'manifest.json'
+
+FEED_SOURCES = (
+    'techcrunch_ai', 'venturebeat_ai', 'the_verge_ai',
+    'ars_technica', 'wired_ai', 'mit_tech_review',
+)
+
+COMPANY_KINDS = {
+    'openai_blog': 'feed',
+    'anthropic_news': 'sitemap',
+    'google_ai_blog': 'feed',
+    'microsoft_ai': 'feed',
+    'meta_ai': 'page',
+}
+
+WORDS = (
+    'model', 'agent', 'cloud', 'chip', 'data', 'platform', 'users', 'team',
+    'update', 'feature', 'developers', 'enterprise', 'app', 'voice', 'search',
+    'privacy', 'market', 'robot', 'open', 'source', 'pricing', 'api', 'safety',
+    'training', 'inference', 'startup', 'week', 'plans', 'report', 'tools',
+)
+
+PRODUCT_PHRASES = (
+    'OpenAI launches', 'Anthropic unveils', 'Google AI introduces',
+    'Meta AI releases', 'Microsoft AI announces', 'Nvidia AI partnership',
+    'ChatGPT gets', 'Claude-3 update', 'Gemini Pro', 'new model', 'AI agent',
+    'multimodal', 'code generation', 'funding round', 'acquisition of',
+)
+
+ACADEMIC_PHRASES = ('new paper', 'research study', 'arXiv preprint', 'benchmark dataset')
+
+
+def load_manifest(root):
+    """Return the corpus manifest in ``root``, or None if there is none"""
+    path = os.path.join(root, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_manifest(root, manifest):
+    with open(os.path.join(root, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def _title(rng):
+    roll = rng.random()
+    if roll < 0.55:
+        return f"{rng.choice(PRODUCT_PHRASES)} {_sentence(rng, 6)}".capitalize()
+    if roll < 0.65:
+        return f"{rng.choice(ACADEMIC_PHRASES)} on {_sentence(rng, 5)}".capitalize()
+    return _sentence(rng, 9).capitalize()
+
+
+def _summary_html(rng):
+    """A feed description the way news sites ship them: markup and entities"""
+    paragraphs = []
+    for _ in range(rng.randint(1, 4)):
+        text = html.escape(_sentence(rng, rng.randint(20, 60)))
+        if rng.random() < 0.4:
+            text += f' <a href="https://example.com/{rng.randrange(10**6)}">{rng.choice(WORDS)}</a>'
+        if rng.random() < 0.3:
+            text += ' &mdash; &ldquo;quoted&rdquo; &amp; more&#8230;'
+        paragraphs.append(f'<p>{text}</p>')
+    if rng.random() < 0.5:
+        paragraphs.insert(0, f'<img src="https://example.com/{rng.randrange(10**6)}.jpg" alt="" />')
+    return '\n'.join(paragraphs)
+
+
+def _rss(rng, name, now, items):
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">',
+        f'<channel><title>{name}</title><link>https://{name}.example.com/</link>',
+    ]
+    published = now
+    for index in range(items):
+        published -= timedelta(minutes=rng.randint(10, 90))
+        parts.append(
+            '<item>'
+            f'<title>{html.escape(_title(rng))}</title>'
+            f'<link>https://{name}.example.com/{index}</link>'
+            f'<description><![CDATA[{_summary_html(rng)}]]></description>'
+            f'<pubDate>{format_datetime(published)}</pubDate>'
+            '</item>'
+        )
+    parts.append('</channel></rss>')
+    return '\n'.join(parts).encode('utf-8')
+
+
+def _atom(rng, name, now, items):
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f'<title>{name}</title>',
+    ]
+    published = now
+    for index in range(items):
+        published -= timedelta(minutes=rng.randint(10, 90))
+        parts.append(
+            '<entry>'
+            f'<title>{html.escape(_title(rng))}</title>'
+            f'<link rel="alternate" href="https://{name}.example.com/{index}"/>'
+            f'<summary type="html">{html.escape(_summary_html(rng))}</summary>'
+            f'<published>{published.isoformat()}</published>'
+            '</entry>'
+        )
+    parts.append('</feed>')
+    return '\n'.join(parts).encode('utf-8')
+
+
+def _sitemap(rng, now, items):
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+    for index in range(items):
+        section = 'news' if rng.random() < 0.6 else rng.choice(('careers', 'legal', 'research'))
+        slug = '-'.join(rng.choice(WORDS) for _ in range(4))
+        lastmod = (now - timedelta(days=index)).date().isoformat()
+        parts.append(f'<url><loc>https://company.example.com/{section}/{slug}-{index}</loc><lastmod>{lastmod}</lastmod></url>')
+    parts.append('</urlset>')
+    return '\n'.join(parts).encode('utf-8')
+
+
+def _blog_page(rng, items):
+    parts = ['<!DOCTYPE html><html><head><title>Blog</title>']
+    parts.append('<script>' + 'var x = 1;' * 200 + '</script></head><body><nav>')
+    parts.extend(f'<a href="/{word}">{word.capitalize()}</a>' for word in WORDS[:12])
+    parts.append('</nav><main>')
+    for index in range(items):
+        slug = '-'.join(rng.choice(WORDS) for _ in range(4))
+        parts.append(
+            f'<article><a href="/blog/{slug}-{index}"><h2>{html.escape(_title(rng))}</h2></a>'
+            f'<p>{html.escape(_sentence(rng, 30))}</p></article>'
+        )
+    parts.append('</main><footer>' + _sentence(rng, 50) + '</footer></body></html>')
+    return '\n'.join(parts).encode('utf-8')
+
+
+def generate_synthetic(root, items_per_feed=100, seed=17):
+    """Write a deterministic synthetic corpus into ``root``
+
+    Shaped like the real sources: RSS and Atom feeds with HTML descriptions,
+    a sitemap with mixed sections and a blog page full of navigation links.
+    """
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+    os.makedirs(os.path.join(root, 'feeds'), exist_ok=True)
+    os.makedirs(os.path.join(root, 'company'), exist_ok=True)
+
+    manifest = {'recorded_at': now.isoformat(), 'synthetic': True, 'feeds': {}, 'company': {}}
+    for index, name in enumerate(FEED_SOURCES):
+        builder = _atom if index % 3 == 2 else _rss
+        relative = f'feeds/{name}.xml'
+        with open(os.path.join(root, relative), 'wb') as f:
+            f.write(builder(rng, name, now, items_per_feed))
+        manifest['feeds'][name] = {'file': relative, 'url': f'https://{name}.example.com/feed'}
+
+    for name, kind in COMPANY_KINDS.items():
+        if kind == 'feed':
+            body, extension = _rss(rng, name, now, 20), 'xml'
+        elif kind == 'sitemap':
+            body, extension = _sitemap(rng, now, 200), 'xml'
+        else:
+            body, extension = _blog_page(rng, 30), 'html'
+        relative = f'company/{name}.{extension}'
+        with open(os.path.join(root, relative), 'wb') as f:
+            f.write(body)
+        manifest['company'][name] = {'kind': kind, 'file': relative, 'url': f'https://{name}.example.com/'}
+
+    write_manifest(root, manifest)
+    return manifest
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Scrapers hang up mid-body on purpose (early termination, deadlines)
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FixtureServer:
+    """Serves a corpus over local HTTP, standing in for the real sites
+
+    Every file under ``root`` is served at its relative path with a strong
+    ETag, and If-None-Match is honoured, so the conditional-GET path of the
+    scrapers is exercised exactly as against a live server.
+    """
+
+    def __init__(self, root, host='127.0.0.1', port=0):
+        self.root = os.path.abspath(root)
+        self._bodies = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; without this,
+            # Nagle plus delayed ACKs add ~40ms to every response
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                entry = server._load(self.path.split('?', 1)[0])
+                if entry is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body, etag, content_type = entry
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = _QuietHTTPServer((host, port), Handler)
+        self._thread = None
+
+    def _load(self, path):
+        entry = self._bodies.get(path)
+        if entry is None:
+            full = os.path.abspath(os.path.join(self.root, path.lstrip('/')))
+            if not full.startswith(self.root + os.sep) or not os.path.isfile(full):
+                return None
+            with open(full, 'rb') as f:
+                body = f.read()
+            etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+            content_type = 'text/html; charset=utf-8' if full.endswith('.html') else 'application/xml'
+            entry = self._bodies[path] = (body, etag, content_type)
+        return entry
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def url(self, relative):
+        return f'{self.base_url}/{relative}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fixture-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Telegram Bot API
+
+Speaks enough of the Bot API over HTTP for python-telegram-bot to run
+against it (point ``Application.builder().base_url(...)`` at ``base_url``):
+getMe and sendMessage are implemented, other methods answer ``true``, and
+``GET /stats`` returns the server's counters.
+
+Misbehaviour is simulated the way Telegram does it:
+
+- ``latency``/``jitter``: seconds added to every response
+- ``flood_limit``: global messages/second; beyond it sendMessage answers 429
+  with ``retry_after``, as Telegram's flood control does
+- ``flood_probability``: extra random 429s
+- ``not_found``/``blocked``: fraction of chats answering 400 "chat not
+  found" or 403 "bot was blocked by the user". Chosen by hashing the chat id,
+  so the same chats fail on every run.
+
+    python benchmarks/fake_telegram.py --port 8081 --latency 0.05 --blocked 0.02
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from urllib.parse import parse_qsl
+
+PATH_RE = re.compile(r'^/bot(?P<token>[^/]+)/(?P<method>\w+)$')
+
+
+def chat_bucket(chat_id):
+    """Stable pseudo-random fraction in [0, 1) for a chat id"""
+    return (int(chat_id) * 2654435761 % 2 ** 32) / 2 ** 32
+
+
+class FakeTelegramServer:
+    """Asyncio HTTP/1.1 server emulating the Bot API"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 flood_limit=30.0, flood_probability=0.0, not_found=0.0,
+                 blocked=0.0, seed=1):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.flood_limit = flood_limit
+        self.flood_probability = flood_probability
+        self.not_found = not_found
+        self.blocked = blocked
+        self._random = random.Random(seed)
+
+        self._tokens = flood_limit
+        self._refilled = time.monotonic()
+        self._message_id = 0
+        self.stats = {
+            'requests': 0,
+            'sent': 0,
+            'flood_waits': 0,
+            'not_found': 0,
+            'blocked': 0,
+        }
+
+        self._server = None
+        self._connections = set()
+        self._loop = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """Value for ApplicationBuilder.base_url"""
+        return f'http://{self.host}:{self.port}/bot'
+
+    # -- Bot API methods --------------------------------------------------
+
+    def _flood_wait(self):
+        """Seconds the client must wait, or 0 if the message may go out"""
+        if self.flood_probability and self._random.random() < self.flood_probability:
+            return 1
+        if not self.flood_limit:
+            return 0
+        now = time.monotonic()
+        self._tokens = min(self.flood_limit, self._tokens + (now - self._refilled) * self.flood_limit)
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return max(1, math.ceil((1 - self._tokens) / self.flood_limit))
+
+    def _send_message(self, params):
+        chat_id = int(params.get('chat_id', 0))
+        bucket = chat_bucket(chat_id)
+        if bucket < self.not_found:
+            self.stats['not_found'] += 1
+            return 400, {'ok': False, 'error_code': 400, 'description': 'Bad Request: chat not found'}
+        if bucket < self.not_found + self.blocked:
+            self.stats['blocked'] += 1
+            return 403, {'ok': False, 'error_code': 403, 'description': 'Forbidden: bot was blocked by the user'}
+
+        retry_after = self._flood_wait()
+        if retry_after:
+            self.stats['flood_waits'] += 1
+            return 429, {
+                'ok': False,
+                'error_code': 429,
+                'description': f'Too Many Requests: retry after {retry_after}',
+                'parameters': {'retry_after': retry_after},
+            }
+
+        self.stats['sent'] += 1
+        self._message_id += 1
+        return 200, {'ok': True, 'result': {
+            'message_id': self._message_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private' if chat_id > 0 else 'group'},
+            'text': params.get('text', ''),
+        }}
+
+    def _dispatch(self, method, params):
+        if method == 'getMe':
+            return 200, {'ok': True, 'result': {
+                'id': 1, 'is_bot': True, 'first_name': 'Fake', 'username': 'fake_bot',
+                'can_join_groups': True, 'can_read_all_group_messages': False,
+                'supports_inline_queries': False,
+            }}
+        if method == 'sendMessage':
+            return self._send_message(params)
+        return 200, {'ok': True, 'result': True}
+
+    # -- HTTP plumbing ----------------------------------------------------
+
+    @staticmethod
+    def _parse_body(headers, body):
+        if not body:
+            return {}
+        content_type = headers.get('content-type', '')
+        if 'json' in content_type:
+            return json.loads(body)
+        return dict(parse_qsl(body.decode('utf-8'), keep_blank_values=True))
+
+    async def _handle(self, reader, writer):
+        self._connections.add(asyncio.current_task())
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                _, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                self.stats['requests'] += 1
+                path = path.split('?', 1)[0]
+                match = PATH_RE.match(path)
+                if path == '/stats':
+                    status, payload = 200, dict(self.stats)
+                elif match is None:
+                    status, payload = 404, {'ok': False, 'error_code': 404, 'description': 'Not Found'}
+                else:
+                    status, payload = self._dispatch(match.group('method'), self._parse_body(headers, body))
+
+                delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+                if delay:
+                    await asyncio.sleep(delay)
+
+                data = json.dumps(payload).encode('utf-8')
+                writer.write(
+                    f'HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n'
+                    f'Content-Length: {len(data)}\r\n\r\n'.encode('latin-1') + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._connections.discard(asyncio.current_task())
+            writer.close()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        # Client keep-alive connections would otherwise outlive the server
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def start_in_thread(self):
+        """Run the server on its own event loop in a daemon thread
+
+        Keeps the server's work off the loop being measured.
+        """
+        started = threading.Event()
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=serve, name='fake-telegram', daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop_thread(self):
+        future = asyncio.run_coroutine_threadsafe(self.stop(), self._loop)
+        future.result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', 1)[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds per response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random seconds per response')
+    parser.add_argument('--flood-limit', type=float, default=30.0, help='messages/second before 429s (0: off)')
+    parser.add_argument('--flood-probability', type=float, default=0.0)
+    parser.add_argument('--not-found', type=float, default=0.0, help='fraction of chats not found')
+    parser.add_argument('--blocked', type=float, default=0.0, help='fraction of chats that blocked the bot')
+    args = parser.parse_args()
+
+    server = FakeTelegramServer(
+        host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+        flood_limit=args.flood_limit, flood_probability=args.flood_probability,
+        not_found=args.not_found, blocked=args.blocked,
+    )
+
+    async def serve():
+        await server.start()
+        print(f"Fake Bot API listening on {server.base_url}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(server.stats)
+
+
+if __name__ == '__main__':
+    main()
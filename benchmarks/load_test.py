@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""Broadcast load test against a local fake Telegram Bot API
+
+Builds a real AINewsBot with N synthetic subscribers and a pre-filled
+article store (no scraping), points python-telegram-bot at the fake API in
+fake_telegram.py and runs one send_updates_to_subscribers broadcast, plus
+optionally a burst of concurrent /latest commands. Reports completion time,
+messages/second, retries, flood waits, unreachable chats and event-loop lag.
+
+    python benchmarks/load_test.py --subscribers 1000
+    python benchmarks/load_test.py --subscribers 100000 --rate 2000 --flood-limit 0
+    python benchmarks/load_test.py --subscribers 5000 --blocked 0.05 --latest-users 200
+
+With the defaults (bot rate 25/s, server flood limit 30/s) the run is paced
+like production; raise --rate and --flood-limit to stress the machinery.
+The fake API runs in a thread of this process unless --api-url points at
+one started separately (fake_telegram.py), which keeps its CPU use out of
+the measurement at high rates.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from fake_telegram import FakeTelegramServer  # noqa: E402
+
+FAKE_TOKEN = '123456:LOADTEST'
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a sleeping task
+
+    Anything blocking the loop (sync I/O, heavy CPU in a coroutine) shows up
+    as lag; a healthy loop stays within a millisecond or two.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(time.perf_counter() - started - self.interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def summary(self):
+        if not self.samples:
+            return {'mean_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+        ordered = sorted(self.samples)
+        return {
+            'mean_ms': statistics.fmean(ordered) * 1000,
+            'p99_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+            'max_ms': ordered[-1] * 1000,
+        }
+
+
+class ExternalServer:
+    """A fake API started elsewhere, seen through its /stats endpoint"""
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+        self.base_url = f'{self.url}/bot'
+        self._before = self._fetch_stats()
+        self.stats = {}
+
+    def _fetch_stats(self):
+        with urllib.request.urlopen(f'{self.url}/stats', timeout=10) as response:
+            return json.load(response)
+
+    def stop_thread(self):
+        after = self._fetch_stats()
+        self.stats = {name: value - self._before.get(name, 0) for name, value in after.items()}
+
+
+def synthetic_articles(count):
+    """Same-source stories, which the story clusterer keeps apart"""
+    from date_utils import utc_now
+    now = utc_now()
+    return [{
+        'title': f"Example AI launches model number {index} with new agent features",
+        'link': f"https://example.com/articles/{index}",
+        'summary': "OpenAI, Anthropic and Google shipped updates this week. " * 4,
+        'source': 'techcrunch_ai',
+        'source_id': 'techcrunch_ai',
+        'published': '',
+        'published_at': now - timedelta(minutes=index * 5),
+        'keywords': ['launches', 'ai agent'],
+    } for index in range(count)]
+
+
+def build_bot(args, data_dir):
+    os.environ['TELEGRAM_BOT_TOKEN'] = FAKE_TOKEN
+    os.environ['BOT_DATA_DIR'] = data_dir
+    os.environ['BROADCAST_RATE'] = str(args.rate)
+    os.environ['BROADCAST_CONCURRENCY'] = str(args.concurrency)
+    from telegram_bot import AINewsBot
+
+    bot = AINewsBot()
+    bot.pipeline.warmed = True  # Serve the synthetic store; never scrape
+    bot.store.add(synthetic_articles(args.articles))
+
+    first_id = 10 ** 9
+    for chat_id in range(first_id, first_id + args.subscribers):
+        bot.subscribers.add(chat_id)
+    bot.subscribers.flush()
+    return bot
+
+
+def latest_update(bot, chat_id, message_id):
+    from telegram import Update
+    return Update.de_json({
+        'update_id': message_id,
+        'message': {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Load'},
+            'text': '/latest',
+        },
+    }, bot)
+
+
+async def run(args):
+    from telegram.ext import Application
+
+    if args.api_url:
+        server = ExternalServer(args.api_url)
+    else:
+        server = FakeTelegramServer(
+            latency=args.latency, jitter=args.jitter, flood_limit=args.flood_limit,
+            flood_probability=args.flood_probability, not_found=args.not_found,
+            blocked=args.blocked,
+        ).start_in_thread()
+
+    with tempfile.TemporaryDirectory(prefix='ai-news-load-') as data_dir:
+        news_bot = build_bot(args, data_dir)
+        app = Application.builder().token(FAKE_TOKEN).base_url(server.base_url).build()
+        monitor = LoopLagMonitor()
+
+        try:
+            async with app:
+                monitor.start()
+
+                started = time.perf_counter()
+                stats = await news_bot.send_updates_to_subscribers(app.bot) or {}
+                broadcast_seconds = time.perf_counter() - started
+                broadcast_lag = monitor.summary()
+
+                latest = None
+                if args.latest_users:
+                    monitor.samples.clear()
+                    timings = []
+                    errors = []
+
+                    async def one(index):
+                        update = latest_update(app.bot, 2 * 10 ** 9 + index, index + 1)
+                        begun = time.perf_counter()
+                        try:
+                            await news_bot.latest_command(update, None)
+                        except Exception as e:
+                            # PTB would log these from its error handler
+                            errors.append(e)
+                        timings.append(time.perf_counter() - begun)
+
+                    started = time.perf_counter()
+                    await asyncio.gather(*(one(index) for index in range(args.latest_users)))
+                    timings.sort()
+                    latest = {
+                        'seconds': time.perf_counter() - started,
+                        'errors': len(errors),
+                        'p50': timings[len(timings) // 2],
+                        'p95': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+                        'lag': monitor.summary(),
+                    }
+
+                await monitor.stop()
+        finally:
+            remaining = len(news_bot.subscribers)
+            news_bot.subscribers.close()
+            server.stop_thread()
+
+    sent = stats.get('sent', 0)
+    print(f"subscribers        {args.subscribers:,}")
+    print(f"broadcast time     {broadcast_seconds:.2f} s")
+    print(f"messages sent      {sent:,} ({sent / broadcast_seconds:,.1f} msg/s)")
+    print(f"failed             {stats.get('failed', 0):,}")
+    print(f"retries            {stats.get('retries', 0):,}")
+    print(f"unreachable        {len(stats.get('unreachable', [])):,} (subscribers left: {remaining:,})")
+    print(f"server 429s        {server.stats['flood_waits']:,}")
+    print(f"server requests    {server.stats['requests']:,}")
+    print(
+        f"loop lag           mean {broadcast_lag['mean_ms']:.2f} ms, "
+        f"p99 {broadcast_lag['p99_ms']:.2f} ms, max {broadcast_lag['max_ms']:.2f} ms"
+    )
+    if latest:
+        print(f"/latest x{args.latest_users:<8} {latest['seconds']:.2f} s "
+              f"(p50 {latest['p50']:.2f} s, p95 {latest['p95']:.2f} s, {latest['errors']} errors)")
+        print(
+            f"loop lag (/latest) mean {latest['lag']['mean_ms']:.2f} ms, "
+            f"p99 {latest['lag']['p99_ms']:.2f} ms, max {latest['lag']['max_ms']:.2f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', 1)[0])
+    parser.add_argument('--subscribers', type=int, default=1000)
+    parser.add_argument('--articles', type=int, default=10, help='articles in the store')
+    parser.add_argument('--rate', type=float, default=25, help='bot-side global messages/second')
+    parser.add_argument('--concurrency', type=int, default=32, help='broadcast workers')
+    parser.add_argument('--latest-users', type=int, default=0, help='concurrent /latest commands')
+    parser.add_argument('--api-url', help='use a separately started fake API, e.g. http://127.0.0.1:8081')
+    parser.add_argument('--latency', type=float, default=0.03, help='fake API seconds per response')
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--flood-limit', type=float, default=30, help='fake API messages/second (0: off)')
+    parser.add_argument('--flood-probability', type=float, default=0.0)
+    parser.add_argument('--not-found', type=float, default=0.0)
+    parser.add_argument('--blocked', type=float, default=0.0)
+    parser.add_argument('-v', '--verbose', action='store_true', help='keep bot logging')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.ERROR)
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
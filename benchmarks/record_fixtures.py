@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Record the live sources into a benchmark corpus
+
+Downloads every feed in AINewsScraper.sources and, for each company source,
+the first thing the company scraper would use (feed, sitemap or page), then
+writes a manifest next to them. Run it occasionally so the benchmarks replay
+content shaped like today's sites:
+
+    python benchmarks/record_fixtures.py benchmarks/fixtures
+
+Pass --synthetic to write the deterministic synthetic corpus instead.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+from http_client import DEFAULT_HEADERS  # noqa: E402
+from ai_news_scraper import AINewsScraper  # noqa: E402
+from company_news_scraper import CompanyNewsScraper, SITE_RULES  # noqa: E402
+from corpus import generate_synthetic, write_manifest  # noqa: E402
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def _download(session, url, timeout):
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+
+def record(root, timeout=20):
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    os.makedirs(os.path.join(root, 'feeds'), exist_ok=True)
+    os.makedirs(os.path.join(root, 'company'), exist_ok=True)
+
+    manifest = {
+        'recorded_at': datetime.now(timezone.utc).isoformat(),
+        'synthetic': False,
+        'feeds': {},
+        'company': {},
+    }
+
+    for name, url in AINewsScraper().sources.items():
+        try:
+            body = _download(session, url, timeout)
+        except Exception as e:
+            print(f"skip {name}: {e}")
+            continue
+        relative = f'feeds/{name}.xml'
+        with open(os.path.join(root, relative), 'wb') as f:
+            f.write(body)
+        manifest['feeds'][name] = {'file': relative, 'url': url}
+        print(f"{name}: {len(body)} bytes")
+
+    for name, page_url in CompanyNewsScraper().company_sources.items():
+        rule = SITE_RULES.get(name, {})
+        candidates = [(url, 'feed', 'xml') for url in rule.get('feeds', [])]
+        if rule.get('sitemap'):
+            candidates.append((rule['sitemap'], 'sitemap', 'xml'))
+        candidates.append((page_url, 'page', 'html'))
+
+        for url, kind, extension in candidates:
+            try:
+                body = _download(session, url, timeout)
+            except Exception as e:
+                print(f"skip {name} {kind}: {e}")
+                continue
+            relative = f'company/{name}.{extension}'
+            with open(os.path.join(root, relative), 'wb') as f:
+                f.write(body)
+            manifest['company'][name] = {'kind': kind, 'file': relative, 'url': url}
+            print(f"{name} ({kind}): {len(body)} bytes")
+            break
+
+    write_manifest(root, manifest)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', 1)[0])
+    parser.add_argument('root', nargs='?', default=DEFAULT_ROOT, help='corpus directory')
+    parser.add_argument('--synthetic', action='store_true', help='write the synthetic corpus instead')
+    parser.add_argument('--timeout', type=float, default=20)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        generate_synthetic(args.root)
+    else:
+        record(args.root, timeout=args.timeout)
+    print(f"Corpus written to {args.root}")
+
+
+if __name__ == '__main__':
+    main()
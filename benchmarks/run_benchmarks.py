@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""Offline benchmarks for the scraping pipeline
+
+Replays a fixture corpus (see corpus.py) from a local HTTP server and times
+each pipeline stage: feed fetch+parse (cold and 304), HTML cleaning, keyword
+extraction, date windowing, message formatting, company page extraction and
+get_latest_news end to end. For every stage it reports throughput, per-call
+latency percentiles and the tracemalloc peak of one round.
+
+    python benchmarks/run_benchmarks.py                  # report only
+    python benchmarks/run_benchmarks.py --save-baseline  # record baseline.json
+    python benchmarks/run_benchmarks.py --check          # fail on regressions
+
+Without a recorded corpus in benchmarks/fixtures a synthetic one is
+generated, so the suite always runs without network access.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+DEFAULT_FIXTURES = os.path.join(HERE, 'fixtures')
+DEFAULT_BASELINE = os.path.join(HERE, 'baseline.json')
+
+# Allowed slowdown / growth relative to the baseline before --check fails,
+# plus slack for allocator noise on small peaks. The gate uses throughput,
+# median latency and peak memory; tail percentiles are reported but too
+# noisy on shared machines to fail a build on.
+DEFAULT_TOLERANCE = 0.50
+MEMORY_SLACK_KIB = 64
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class Stage:
+    """One benchmarked operation applied to each item of a workload
+
+    ``reset`` runs before every round (not timed) and ``units`` says how
+    much work a call did, e.g. how many entries a feed fetch returned.
+    """
+
+    def __init__(self, name, unit, items, call, reset=None, units=None):
+        self.name = name
+        self.unit = unit
+        self.items = items
+        self.call = call
+        self.reset = reset or (lambda: None)
+        self.units = units or (lambda result: 1)
+
+    def run_round(self, timings=None):
+        self.reset()
+        done = 0
+        clock = time.perf_counter_ns
+        for item in self.items:
+            start = clock()
+            result = self.call(item)
+            elapsed = clock() - start
+            if timings is not None:
+                timings.append(elapsed)
+            done += self.units(result)
+        return done
+
+    def measure(self, rounds):
+        self.run_round()  # warm-up
+
+        timings = []
+        total_units = 0
+        for _ in range(rounds):
+            total_units += self.run_round(timings)
+        total_seconds = sum(timings) / 1e9
+
+        tracemalloc.start()
+        try:
+            self.reset()
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            self.run_round()
+            peak = tracemalloc.get_traced_memory()[1] - before
+        finally:
+            tracemalloc.stop()
+
+        timings.sort()
+        return {
+            'unit': self.unit,
+            'calls': len(timings),
+            'units': total_units,
+            'units_per_sec': round(total_units / total_seconds, 1) if total_seconds else 0.0,
+            'p50_ms': round(percentile(timings, 0.50) / 1e6, 4),
+            'p95_ms': round(percentile(timings, 0.95) / 1e6, 4),
+            'p99_ms': round(percentile(timings, 0.99) / 1e6, 4),
+            'peak_kib': round(max(peak, 0) / 1024, 1),
+        }
+
+
+def build_stages(manifest, server, data_dir):
+    os.environ['BOT_DATA_DIR'] = data_dir
+    import ai_news_scraper
+    from ai_news_scraper import AINewsScraper
+    from company_news_scraper import CompanyNewsScraper, SITE_RULES
+    from date_utils import parse_datetime
+    from feed_parser import iter_feed_entries
+    from html_cleaner import HTMLCleaner
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    # Replay the corpus at the time it was recorded so date windows see it
+    # as fresh
+    recorded_at = datetime.fromisoformat(manifest['recorded_at'])
+    ai_news_scraper.utc_now = lambda: recorded_at
+
+    scraper = AINewsScraper()
+    scraper.sources = {
+        name: server.url(entry['file']) for name, entry in manifest['feeds'].items()
+    }
+    feed_urls = list(scraper.sources.values())
+    # Network-bound stages need more samples than there are feeds
+    fetch_workload = feed_urls * 5
+
+    def forget_feeds():
+        scraper.feed_cache.clear()
+        scraper.http.validators.clear()
+
+    def fetch(url):
+        return scraper.fetch_rss_feed(url)
+
+    def fetch_cold(url):
+        scraper.feed_cache.pop(url, None)
+        scraper.http.forget(url)
+        return scraper.fetch_rss_feed(url)
+
+    # Raw material for the per-entry stages, straight from the corpus
+    raw_entries = []
+    for entry in manifest['feeds'].values():
+        with open(os.path.join(server.root, entry['file']), 'rb') as f:
+            raw_entries.extend(iter_feed_entries([f.read()]))
+    summaries = [entry['summary'] for entry in raw_entries]
+    published = [entry['published'] for entry in raw_entries]
+
+    forget_feeds()
+    cleaned = [entry for url in feed_urls for entry in scraper.fetch_rss_feed(url)]
+    texts = [f"{entry['title']} {entry['summary']}" for entry in cleaned]
+    articles = [scraper.normalize_entry(entry, 'benchmark_source') for entry in cleaned]
+
+    def latest_cold(hours):
+        forget_feeds()
+        return scraper.get_latest_news(hours)
+
+    def fresh_cleaner():
+        scraper.html_cleaner = HTMLCleaner()
+
+    company = CompanyNewsScraper(rules={
+        name: {
+            'name': name,
+            'feeds': [server.url(entry['file'])] if entry['kind'] == 'feed' else [],
+            'sitemap': server.url(entry['file']) if entry['kind'] == 'sitemap' else None,
+            'link_pattern': SITE_RULES.get(name, {}).get('link_pattern', r'.'),
+        }
+        for name, entry in manifest['company'].items()
+    })
+    company.company_sources = {
+        name: server.url(entry['file'] if entry['kind'] == 'page' else 'missing')
+        for name, entry in manifest['company'].items()
+    }
+
+    def forget_company():
+        company._extracted.clear()
+        company._discovered_feeds.clear()
+        company.http.validators.clear()
+
+    return [
+        Stage('fetch_rss_feed', 'entries', fetch_workload, fetch_cold, units=len),
+        Stage('fetch_rss_feed (304)', 'entries', fetch_workload, fetch, units=len),
+        Stage('clean_html_content', 'entries', summaries, scraper.clean_html_content, reset=fresh_cleaner),
+        Stage('extract_ai_keywords', 'entries', texts, scraper.extract_ai_keywords),
+        Stage('is_recent', 'entries', published, scraper.is_recent, reset=parse_datetime.cache_clear),
+        Stage('format_article_message', 'articles', articles, scraper.format_article_message),
+        Stage('company scrape_source', 'articles', list(company.company_sources),
+              company.scrape_source, reset=forget_company, units=len),
+        Stage('get_latest_news', 'calls', [24] * 10, latest_cold),
+        Stage('get_latest_news (304)', 'calls', [24] * 10, scraper.get_latest_news),
+    ]
+
+
+def run(fixtures, rounds, only=None):
+    from corpus import FixtureServer, generate_synthetic, load_manifest
+
+    with tempfile.TemporaryDirectory(prefix='ai-news-bench-') as scratch:
+        manifest = load_manifest(fixtures) if fixtures else None
+        if manifest is None:
+            fixtures = os.path.join(scratch, 'corpus')
+            manifest = generate_synthetic(fixtures)
+
+        with FixtureServer(fixtures) as server:
+            stages = build_stages(manifest, server, os.path.join(scratch, 'data'))
+            results = {}
+            for stage in stages:
+                if only and not any(pattern in stage.name for pattern in only):
+                    continue
+                results[stage.name] = stage.measure(rounds)
+                print_row(stage.name, results[stage.name])
+
+    return {
+        'corpus': {
+            'recorded_at': manifest['recorded_at'],
+            'synthetic': manifest.get('synthetic', False),
+        },
+        'python': platform.python_version(),
+        'rounds': rounds,
+        'stages': results,
+    }
+
+
+def print_header():
+    print(f"{'stage':<26} {'throughput':>20} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KiB':>9}")
+    print('-' * 87)
+
+
+def print_row(name, result):
+    throughput = f"{result['units_per_sec']:,.0f} {result['unit']}/s"
+    print(
+        f"{name:<26} {throughput:>20} {result['p50_ms']:>9.3f} {result['p95_ms']:>9.3f} "
+        f"{result['p99_ms']:>9.3f} {result['peak_kib']:>9.1f}"
+    )
+
+
+def compare(current, baseline, tolerance):
+    """Return a list of human-readable regressions against ``baseline``"""
+    regressions = []
+    if current['corpus'] != baseline.get('corpus'):
+        print("warning: baseline was recorded against a different corpus")
+
+    for name, base in baseline.get('stages', {}).items():
+        result = current['stages'].get(name)
+        if result is None:
+            continue
+        if result['units_per_sec'] < base['units_per_sec'] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {result['units_per_sec']:,.0f} < baseline {base['units_per_sec']:,.0f}"
+            )
+        if result['p50_ms'] > base['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {result['p50_ms']:.3f} ms > baseline {base['p50_ms']:.3f} ms")
+        if result['peak_kib'] > base['peak_kib'] * (1 + tolerance) + MEMORY_SLACK_KIB:
+            regressions.append(f"{name}: peak {result['peak_kib']:.1f} KiB > baseline {base['peak_kib']:.1f} KiB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n', 1)[0])
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES, help='corpus directory (synthetic if absent)')
+    parser.add_argument('--synthetic', action='store_true', help='ignore recorded fixtures')
+    parser.add_argument('--rounds', type=int, default=5, help='timed rounds per stage')
+    parser.add_argument('-k', dest='only', action='append', help='only stages whose name contains this')
+    parser.add_argument('--json', help='also write results to this file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='store results as the new baseline')
+    parser.add_argument('--check', action='store_true', help='exit non-zero on regressions')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    print_header()
+    results = run(None if args.synthetic else args.fixtures, args.rounds, args.only)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+
+    if args.check:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import time
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TimedOut
+from metrics import MESSAGES_SENT, TELEGRAM_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# Errors meaning the chat will never accept messages from us again
+UNREACHABLE_MARKERS = ('chat not found', 'bot was blocked', 'user is deactivated', 'bot was kicked')
+
+
+class TokenBucket:
+    """Async token bucket shared by all senders
+
+    Waiters are served in arrival order. ``pause`` holds every sender back,
+    which is how a 429 flood-wait from Telegram is honoured globally.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+def _retry_after_seconds(error):
+    """RetryAfter.retry_after is an int in some PTB versions, a timedelta in others"""
+    value = error.retry_after
+    return value.total_seconds() if hasattr(value, 'total_seconds') else float(value)
+
+
+class BroadcastDispatcher:
+    """Send the same message sequence to many chats without blocking the loop
+
+    Chats are pulled from a bounded queue by ``concurrency`` workers. Each chat
+    is handled start to finish by one worker, so its messages arrive in order
+    and are spaced by ``per_chat_interval``. All workers share a token bucket
+    sized to Telegram's global limit.
+    """
+
+    def __init__(self, bot, global_rate=25, per_chat_interval=1.0, concurrency=32, max_retries=3):
+        self.bot = bot
+        self.global_rate = global_rate
+        self.per_chat_interval = per_chat_interval
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+
+    async def broadcast(self, chat_ids, messages):
+        """Deliver ``messages`` (send_message kwargs dicts) to every chat
+
+        ``chat_ids`` may be any iterable, including a lazy chunked one; it is
+        consumed incrementally. Returns a stats dict; ``unreachable`` lists the
+        chats that blocked the bot or no longer exist.
+        """
+        return await self.deliver((chat_id, messages) for chat_id in chat_ids)
+
+    async def deliver(self, deliveries):
+        """Like ``broadcast``, but each chat gets its own message list
+
+        ``deliveries`` yields ``(chat_id, messages)`` pairs; chats receiving
+        the same content should share one list rather than copies.
+        """
+        bucket = TokenBucket(self.global_rate)
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        stats = {'chats': 0, 'sent': 0, 'failed': 0, 'retries': 0, 'unreachable': []}
+        started = time.monotonic()
+
+        async def worker():
+            while True:
+                item = await queue.get()
+                try:
+                    if item is None:
+                        return
+                    chat_id, messages = item
+                    await self._deliver(chat_id, messages, bucket, stats)
+                except Exception as e:
+                    logger.error(f"Error sending to {item[0]}: {e}")
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            for item in deliveries:
+                stats['chats'] += 1
+                await queue.put(item)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+
+        stats['elapsed'] = time.monotonic() - started
+        logger.info(
+            f"Broadcast finished: {stats['sent']} sent, {stats['failed']} failed, "
+            f"{stats['retries']} retries to {stats['chats']} chats in {stats['elapsed']:.1f}s"
+        )
+        return stats
+
+    async def _deliver(self, chat_id, messages, bucket, stats):
+        """Send every message to one chat, in order"""
+        last_sent = None
+        for message in messages:
+            if last_sent is not None:
+                wait = self.per_chat_interval - (time.monotonic() - last_sent)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+            outcome = await self._send(chat_id, message, bucket, stats)
+            last_sent = time.monotonic()
+            if outcome == 'unreachable':
+                stats['unreachable'].append(chat_id)
+                return
+
+    async def _send(self, chat_id, message, bucket, stats):
+        """Send one message, retrying on flood waits and transient errors"""
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            try:
+                await self.bot.send_message(chat_id=chat_id, **message)
+                stats['sent'] += 1
+                MESSAGES_SENT.inc(kind='broadcast')
+                return 'sent'
+            except RetryAfter as e:
+                TELEGRAM_ERRORS.inc(error='RetryAfter')
+                delay = _retry_after_seconds(e)
+                logger.warning(f"Flood limit hit sending to {chat_id}, pausing {delay}s")
+                bucket.pause(delay)
+            except Forbidden as e:
+                TELEGRAM_ERRORS.inc(error='Forbidden')
+                # Blocked by the user or removed from the chat
+                logger.info(f"Chat {chat_id} is unreachable: {e}")
+                stats['failed'] += 1
+                return 'unreachable'
+            except BadRequest as e:
+                TELEGRAM_ERRORS.inc(error='BadRequest')
+                if any(marker in str(e).lower() for marker in UNREACHABLE_MARKERS):
+                    stats['failed'] += 1
+                    return 'unreachable'
+                logger.error(f"Error sending article to {chat_id}: {e}")
+                stats['failed'] += 1
+                return 'failed'
+            except (TimedOut, NetworkError) as e:
+                TELEGRAM_ERRORS.inc(error=type(e).__name__)
+                logger.warning(f"Transient error sending to {chat_id}: {e}")
+                await asyncio.sleep(min(2 ** attempt, 30))
+
+            if attempt < self.max_retries:
+                stats['retries'] += 1
+
+        stats['failed'] += 1
+        return 'failed'
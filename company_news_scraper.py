@@ -1,12 +1,104 @@
-import requests
-from bs4 import BeautifulSoup
-import json
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+import hashlib
+import logging
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from http_client import FeedHTTPClient, DEFAULT_HEADERS
+from feed_parser import iter_feed_entries
+from html_cleaner import strip_html
+from date_utils import parse_datetime
+from metrics import FETCH_BYTES, FETCH_ERRORS, FETCH_ITEMS, FETCH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+
+# Declarative extraction rules, one per company source. For each site the
+# cheapest available strategy wins: a known RSS/Atom feed, then a sitemap,
+# then a feed advertised in the page's <link rel="alternate">, and only then
+# the blog page's anchors matching ``link_pattern``. ``topics`` are the
+# followable keywords every post from the site is tagged with.
+SITE_RULES = {
+    'openai_blog': {
+        'name': 'OpenAI Blog',
+        'topics': ['openai'],
+        'feeds': ['https://openai.com/news/rss.xml'],
+        'link_pattern': r'^/(?:blog|index)/[\w-]+/?$',
+    },
+    'anthropic_news': {
+        'name': 'Anthropic News',
+        'topics': ['anthropic'],
+        'sitemap': 'https://www.anthropic.com/sitemap.xml',
+        'link_pattern': r'^/news/[\w-]+/?$',
+    },
+    'google_ai_blog': {
+        'name': 'Google AI Blog',
+        'topics': ['google ai'],
+        'feeds': ['https://blog.google/technology/ai/rss/'],
+        'link_pattern': r'/\d{4}/\d{2}/[\w-]+\.html$',
+    },
+    'microsoft_ai': {
+        'name': 'Microsoft AI Blog',
+        'topics': ['microsoft ai'],
+        'feeds': ['https://blogs.microsoft.com/ai/feed/'],
+        'link_pattern': r'^/ai/[\w-]+/?$',
+    },
+    'meta_ai': {
+        'name': 'Meta AI Blog',
+        'topics': ['meta ai'],
+        'link_pattern': r'^/blog/[\w-]+/?$',
+    },
+}
+
+FEED_TYPES = ('application/rss+xml', 'application/atom+xml')
+
+
+class _PageLinkExtractor(HTMLParser):
+    """Collects feed autodiscovery links and anchor (href, text) pairs"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.feeds = []
+        self.anchors = []
+        self._href = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'link' and attrs.get('type') in FEED_TYPES and 'alternate' in (attrs.get('rel') or ''):
+            if attrs.get('href'):
+                self.feeds.append(attrs['href'])
+        elif tag == 'a' and attrs.get('href'):
+            self._href = attrs['href']
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._href is not None:
+            self.anchors.append((self._href, ' '.join(''.join(self._text).split())))
+            self._href = None
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+
+
+def _title_from_slug(url):
+    """'https://x.com/news/claude-3-family' -> 'Claude 3 Family'"""
+    slug = urlparse(url).path.rstrip('/').rsplit('/', 1)[-1]
+    slug = re.sub(r'\.html?$', '', slug)
+    return ' '.join(part.capitalize() for part in slug.split('-') if part)
+
 
 class CompanyNewsScraper:
     """Scrape AI company blogs and announcement pages"""
-    
-    def __init__(self):
+
+    def __init__(self, rules=None, max_items=5):
+        self.rules = rules or SITE_RULES
+        self.max_items = max_items
         self.company_sources = {
             'openai_blog': 'https://openai.com/blog/',
             'anthropic_news': 'https://www.anthropic.com/news',
@@ -14,47 +106,224 @@ class CompanyNewsScraper:
             'microsoft_ai': 'https://blogs.microsoft.com/ai/',
             'meta_ai': 'https://ai.meta.com/blog/',
         }
-    
-    def scrape_openai_blog(self):
-        """Scrape OpenAI blog for latest announcements"""
+        self.http = FeedHTTPClient(headers={
+            **DEFAULT_HEADERS,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        })
+        self.timeout = 10
+        self._executor = ThreadPoolExecutor(max_workers=len(self.company_sources), thread_name_prefix='company-fetch')
+
+        # Change detection: url -> (content hash, extracted articles), plus
+        # feeds found through autodiscovery on earlier page fetches
+        self._extracted = {}
+        self._discovered_feeds = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        """Validators, extractions and discovered feeds, for a warm restart"""
+        with self._lock:
+            return {
+                'validators': self.http.snapshot(),
+                'extracted': dict(self._extracted),
+                'discovered_feeds': dict(self._discovered_feeds),
+            }
+
+    def restore(self, state):
+        with self._lock:
+            for url, extracted in state['extracted'].items():
+                self._extracted.setdefault(url, extracted)
+            for source_name, feed_url in state['discovered_feeds'].items():
+                self._discovered_feeds.setdefault(source_name, feed_url)
+        self.http.restore(state['validators'])
+
+    def _fetch(self, source_name, url):
+        """Fetch a URL; return (body, digest), or (body, None) if unchanged
+
+        A page counts as unchanged on a 304 or when its body hashes the same
+        as last time, so callers can reuse the previous extraction.
+        """
+        conditional = url in self._extracted
+        response = self.http.get(url, timeout=self.timeout, conditional=conditional)
+        if response.status_code == 304:
+            self.http.record('cache_hits')
+            FETCH_BYTES.observe(0, source=source_name)
+            return None, None
+        response.raise_for_status()
+
+        body = response.content
+        self.http.store_validators(url, response, len(body))
+        FETCH_BYTES.observe(len(body), source=source_name)
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        with self._lock:
+            previous = self._extracted.get(url)
+        if previous is not None and previous[0] == digest:
+            self.http.record('cache_hits')
+            return body, None
+        return body, digest
+
+    def _cached(self, url):
+        with self._lock:
+            previous = self._extracted.get(url)
+        return [dict(article) for article in previous[1]] if previous else None
+
+    def _remember(self, url, digest, articles):
+        with self._lock:
+            self._extracted[url] = (digest, articles)
+        # Callers (and the article store) annotate what they get back
+        return [dict(article) for article in articles]
+
+    def _from_feed(self, source_name, url, name):
+        body, digest = self._fetch(source_name, url)
+        if not digest:
+            return self._cached(url)
+
+        articles = []
+        for entry in iter_feed_entries([body]):
+            if len(articles) >= self.max_items:
+                break
+            articles.append({
+                'title': entry['title'],
+                'link': entry['link'],
+                'source': name,
+                'published': entry['published'] or 'Recent',
+                'published_at': parse_datetime(entry['published']),
+                'summary': strip_html(entry['summary']),
+            })
+        return self._remember(url, digest, articles)
+
+    def _from_sitemap(self, source_name, url, name, pattern):
+        body, digest = self._fetch(source_name, url)
+        if not digest:
+            return self._cached(url)
+
+        urls = []
+        root = ET.fromstring(body)
+        for node in root.iter(f'{SITEMAP_NS}url'):
+            loc = (node.findtext(f'{SITEMAP_NS}loc') or '').strip()
+            if not loc or not pattern.search(urlparse(loc).path):
+                continue
+            lastmod = (node.findtext(f'{SITEMAP_NS}lastmod') or '').strip()
+            urls.append((parse_datetime(lastmod), lastmod, loc))
+
+        # Newest first; entries without lastmod go last
+        urls.sort(key=lambda item: item[0].timestamp() if item[0] else 0, reverse=True)
+        articles = [{
+            'title': _title_from_slug(loc),
+            'link': loc,
+            'source': name,
+            'published': lastmod or 'Recent',
+            'published_at': published_at,
+            'summary': '',
+        } for published_at, lastmod, loc in urls[:self.max_items]]
+        return self._remember(url, digest, articles)
+
+    def _from_page(self, source_name, url, name, pattern):
+        body, digest = self._fetch(source_name, url)
+        if not digest:
+            return self._cached(url)
+
+        extractor = _PageLinkExtractor()
+        extractor.feed(body.decode('utf-8', 'replace'))
+        extractor.close()
+
+        if extractor.feeds:
+            # The page advertises a feed: use it from now on
+            feed_url = urljoin(url, extractor.feeds[0])
+            self._discovered_feeds[source_name] = feed_url
+            logger.info(f"Discovered feed for {source_name}: {feed_url}")
+            return self._from_feed(source_name, feed_url, name)
+
+        articles = []
+        seen = set()
+        for href, text in extractor.anchors:
+            link = urljoin(url, href)
+            if link in seen or not pattern.search(urlparse(link).path):
+                continue
+            if len(text) <= 10:  # Filter out short/empty titles
+                continue
+            seen.add(link)
+            articles.append({
+                'title': text,
+                'link': link,
+                'source': name,
+                'published': 'Recent',
+                'summary': ''
+            })
+            if len(articles) >= self.max_items:
+                break
+        return self._remember(url, digest, articles)
+
+    def scrape_source(self, source_name):
+        """Scrape one entry of company_sources using its site rules"""
+        started = time.perf_counter()
+        articles = self._scrape_source(source_name)
+        topics = self.rules.get(source_name, {}).get('topics', [])
+        for article in articles:
+            article.setdefault('keywords', list(topics))
+        FETCH_SECONDS.observe(time.perf_counter() - started, source=source_name)
+        FETCH_ITEMS.observe(len(articles), source=source_name)
+        return articles
+
+    def _scrape_source(self, source_name):
+        page_url = self.company_sources.get(source_name)
+        rule = self.rules.get(source_name)
+        if page_url is None or rule is None:
+            return []
+
+        name = rule.get('name', source_name)
+        pattern = re.compile(rule.get('link_pattern', r'.'))
+        feeds = list(rule.get('feeds', []))
+        if source_name in self._discovered_feeds:
+            feeds.append(self._discovered_feeds[source_name])
+
+        for feed_url in feeds:
+            try:
+                articles = self._from_feed(source_name, feed_url, name)
+                if articles:
+                    return articles
+            except Exception as e:
+                logger.warning(f"Feed {feed_url} failed for {source_name}: {e}")
+
+        if rule.get('sitemap'):
+            try:
+                articles = self._from_sitemap(source_name, rule['sitemap'], name, pattern)
+                if articles:
+                    return articles
+            except Exception as e:
+                logger.warning(f"Sitemap failed for {source_name}: {e}")
+
         try:
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-            response = requests.get('https://openai.com/blog/', headers=headers, timeout=10)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                articles = []
-                
-                # Look for blog post links (this may need adjustment based on OpenAI's current structure)
-                blog_posts = soup.find_all('a', href=True)
-                
-                for post in blog_posts[:5]:  # Get first 5
-                    if '/blog/' in post.get('href', ''):
-                        title = post.get_text(strip=True)
-                        if title and len(title) > 10:  # Filter out short/empty titles
-                            articles.append({
-                                'title': title,
-                                'link': f"https://openai.com{post['href']}",
-                                'source': 'OpenAI Blog',
-                                'published': 'Recent',
-                                'summary': 'Latest announcement from OpenAI'
-                            })
-                
-                return articles[:3]  # Return top 3
+            return self._from_page(source_name, page_url, name, pattern) or []
         except Exception as e:
-            print(f"Error scraping OpenAI blog: {e}")
+            FETCH_ERRORS.inc(source=source_name)
+            logger.error(f"Error scraping {source_name}: {e}")
             return []
-    
+
+    def scrape_openai_blog(self):
+        """Scrape OpenAI blog for latest announcements"""
+        return self.scrape_source('openai_blog')[:3]  # Return top 3
+
     def get_company_announcements(self):
-        """Get latest company announcements"""
+        """Get latest company announcements from every site, concurrently"""
         all_announcements = []
-        
-        try:
-            # For now, just get OpenAI blog posts
-            openai_posts = self.scrape_openai_blog()
-            if openai_posts and isinstance(openai_posts, list):
-                all_announcements.extend(openai_posts)
-        except Exception as e:
-            print(f"Error getting company announcements: {e}")
-        
-        return all_announcements  # Always return a list
\ No newline at end of file
+
+        futures = {
+            self._executor.submit(self.scrape_source, source_name): source_name
+            for source_name in self.company_sources
+        }
+        done, _ = wait(futures, timeout=self.timeout * 3)
+
+        # Keep site order stable regardless of completion order
+        results = {}
+        for future in done:
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                logger.error(f"Error getting company announcements: {e}")
+
+        for source_name in self.company_sources:
+            posts = results.get(source_name)
+            if posts and isinstance(posts, list):
+                all_announcements.extend(posts[:3])  # Top 3 per site
+
+        return all_announcements  # Always return a list
@@ -0,0 +1,69 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_rfc822(value):
+    """Parse RSS-style dates such as 'Tue, 10 Jun 2025 14:03:00 +0000'"""
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def _parse_iso8601(value):
+    """Parse Atom-style dates such as '2025-06-10T14:03:00Z'"""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _parse_fallback(value):
+    """Last resort for unusual formats; dateutil is only imported if needed"""
+    from dateutil import parser
+    try:
+        return parser.parse(value)
+    except (ValueError, OverflowError):
+        return None
+
+
+@lru_cache(maxsize=8192)
+def parse_datetime(value):
+    """Parse a feed date string into an aware UTC datetime
+
+    Tries strict RFC 822 and ISO 8601 first and only falls back to dateutil
+    for anything else. Dates without a timezone are taken to be UTC. Returns
+    None when the string can't be parsed. Results are memoized, since feeds
+    repeat the same timestamps on every poll.
+    """
+    if not value or not isinstance(value, str):
+        return None
+
+    value = value.strip()
+    if not value:
+        return None
+
+    # ISO 8601 starts with a four-digit year; RFC 822 with a day name or day
+    if value[:4].isdigit() and value[4:5] == '-':
+        parsed = _parse_iso8601(value) or _parse_rfc822(value)
+    else:
+        parsed = _parse_rfc822(value) or _parse_iso8601(value)
+
+    if parsed is None:
+        parsed = _parse_fallback(value)
+    if parsed is None:
+        logger.debug(f"Unparseable date: {value!r}")
+        return None
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def utc_now():
+    """Current time as an aware UTC datetime"""
+    return datetime.now(timezone.utc)
@@ -0,0 +1,146 @@
+from array import array
+from collections import deque
+import hashlib
+import logging
+import os
+import struct
+import threading
+import time
+from metrics import ARTICLES_DEDUPED
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'DDUP1'
+
+
+def key_hash(key):
+    """64-bit fingerprint of an article key"""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class DedupIndex:
+    """Time-windowed, per-channel record of articles already delivered
+
+    Each channel (e.g. 'broadcast') keeps a ring of generations, each a set of
+    64-bit key hashes covering ``retention / generations`` of time. Whole
+    generations are dropped once they age past the retention window, and a
+    generation that fills up is rotated early, so memory stays bounded no
+    matter how long the process runs. State is saved to a small binary file
+    so restarts don't resend old items.
+    """
+
+    def __init__(self, path=None, retention_hours=168, generations=7, max_keys_per_generation=50000):
+        self.path = path
+        self.retention = retention_hours * 3600
+        self.generations = generations
+        self.span = self.retention / generations
+        self.max_keys_per_generation = max_keys_per_generation
+        self.channels = {}  # channel -> deque of (start_ts, set of hashes)
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        if path and os.path.exists(path):
+            try:
+                self.load()
+            except Exception as e:
+                logger.error(f"Could not load dedup index from {path}: {e}")
+                self.channels = {}
+
+    def _ring(self, channel, now):
+        """Return the channel's generations, rotating and expiring as needed"""
+        ring = self.channels.get(channel)
+        if ring is None:
+            ring = self.channels[channel] = deque()
+
+        while ring and now - ring[0][0] > self.retention:
+            ring.popleft()
+        if (not ring or now - ring[-1][0] >= self.span
+                or len(ring[-1][1]) >= self.max_keys_per_generation):
+            ring.append((now, set()))
+            while len(ring) > self.generations + 1:
+                ring.popleft()
+        return ring
+
+    def unseen(self, channel, articles):
+        """Return the articles not yet delivered on ``channel``
+
+        Articles are keyed by link, falling back to title. Nothing is marked:
+        call ``mark`` with what was actually delivered.
+        """
+        new_articles = []
+        taken = set()
+        with self._lock:
+            ring = self._ring(channel, time.time())
+            skipped = 0
+            for article in articles:
+                hashed = key_hash(article.get('link') or article.get('title', ''))
+                if hashed in taken or any(hashed in keys for _, keys in ring):
+                    skipped += 1
+                    continue
+                taken.add(hashed)
+                new_articles.append(article)
+        if skipped:
+            ARTICLES_DEDUPED.inc(skipped, reason='delivered')
+        return new_articles
+
+    def mark(self, channel, articles):
+        """Record articles as delivered on ``channel``"""
+        with self._lock:
+            current = self._ring(channel, time.time())[-1][1]
+            for article in articles:
+                current.add(key_hash(article.get('link') or article.get('title', '')))
+            if articles:
+                self._dirty = True
+
+    def save(self):
+        """Write the index to disk if it changed"""
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            parts = [MAGIC, struct.pack('<I', len(self.channels))]
+            for channel, ring in self.channels.items():
+                name = channel.encode('utf-8')
+                parts.append(struct.pack('<H', len(name)) + name + struct.pack('<I', len(ring)))
+                for start, keys in ring:
+                    hashes = array('Q', keys)
+                    parts.append(struct.pack('<dI', start, len(hashes)) + hashes.tobytes())
+            self._dirty = False
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(b''.join(parts))
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        """Read the index back from disk, dropping expired generations"""
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(MAGIC):
+            raise ValueError("not a dedup index file")
+
+        offset = len(MAGIC)
+        (channel_count,) = struct.unpack_from('<I', data, offset)
+        offset += 4
+        channels = {}
+        now = time.time()
+        for _ in range(channel_count):
+            (name_length,) = struct.unpack_from('<H', data, offset)
+            offset += 2
+            channel = data[offset:offset + name_length].decode('utf-8')
+            offset += name_length
+            (ring_length,) = struct.unpack_from('<I', data, offset)
+            offset += 4
+            ring = deque()
+            for _ in range(ring_length):
+                start, count = struct.unpack_from('<dI', data, offset)
+                offset += 12
+                hashes = array('Q')
+                hashes.frombytes(data[offset:offset + count * 8])
+                offset += count * 8
+                if now - start <= self.retention:
+                    ring.append((start, set(hashes)))
+            channels[channel] = ring
+
+        with self._lock:
+            self.channels = channels
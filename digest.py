@@ -0,0 +1,81 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Telegram rejects messages longer than this
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+ARTICLE_SEPARATOR = "\n\n"
+
+
+def _fit_block(format_article, article, limit):
+    """Render an article, shortening its title until the block fits ``limit``
+
+    Truncation happens on the raw title before formatting, so escaped entities
+    and tags in the rendered HTML are never cut in half.
+    """
+    block = format_article(article)
+    title = article.get('title', '')
+    if len(block) <= limit or not title:
+        return block
+
+    # Binary search for the longest title prefix that still fits
+    low, high = 0, len(title) - 1
+    best = format_article({**article, 'title': '...'})
+    while low <= high:
+        middle = (low + high) // 2
+        candidate = format_article({**article, 'title': title[:middle] + '...'})
+        if len(candidate) <= limit:
+            best = candidate
+            low = middle + 1
+        else:
+            high = middle - 1
+    return best
+
+
+def pack_blocks(blocks, limit=TELEGRAM_MESSAGE_LIMIT, separator=ARTICLE_SEPARATOR):
+    """Greedily join self-contained HTML blocks into as few messages as fit
+
+    Blocks are never split, so every message is well-formed HTML on its own.
+    """
+    messages = []
+    current = ''
+    for block in blocks:
+        if not block:
+            continue
+        if not current:
+            current = block
+        elif len(current) + len(separator) + len(block) <= limit:
+            current += separator + block
+        else:
+            messages.append(current)
+            current = block
+    if current:
+        messages.append(current)
+    return messages
+
+
+def render_blocks(format_article, articles, limit=TELEGRAM_MESSAGE_LIMIT):
+    """Render each article into a block that fits a message on its own
+
+    ``format_article`` is the article-to-HTML function (normally
+    ``AINewsScraper.format_article_message``). Articles that fail to render
+    are left out.
+    """
+    blocks = []
+    for article in articles:
+        try:
+            blocks.append(_fit_block(format_article, article, limit))
+        except Exception as e:
+            logger.error(f"Error formatting article: {e}")
+    return blocks
+
+
+def build_digest(format_article, articles, header=None, limit=TELEGRAM_MESSAGE_LIMIT):
+    """Render each article once and pack the results into Telegram messages
+
+    The returned list of HTML strings is meant to be sent as-is to every
+    recipient.
+    """
+    blocks = [header] if header else []
+    return pack_blocks(blocks + render_blocks(format_article, articles, limit), limit)
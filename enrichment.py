@@ -0,0 +1,316 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+import codecs
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from article_store import article_key
+from http_client import FeedHTTPClient, DEFAULT_HEADERS
+from metrics import PAGES_ENRICHED
+
+logger = logging.getLogger(__name__)
+
+META_FIELDS = {
+    'og:title': 'title',
+    'og:description': 'description',
+    'og:image': 'image',
+    'og:site_name': 'site_name',
+}
+# Page chrome whose paragraphs are never the article's lead
+SKIPPED_TAGS = frozenset({'script', 'style', 'nav', 'header', 'footer', 'aside', 'form', 'noscript'})
+
+HEADER_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="...; charset=...">
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+
+
+class _LeadExtractor(HTMLParser):
+    """Collects og: metadata and the first paragraphs of a page's body
+
+    Paragraphs seen before an <article> or <main> element starts are taken
+    to be page chrome and dropped. ``done`` turns true once ``lead_chars``
+    of lead text are collected, so the caller can stop reading.
+    """
+
+    def __init__(self, lead_chars=400, min_paragraph=40):
+        super().__init__(convert_charrefs=True)
+        self.lead_chars = lead_chars
+        self.min_paragraph = min_paragraph
+        self.meta = {}
+        self.paragraphs = []
+        self.done = False
+        self._in_content = False
+        self._skipping = 0
+        self._paragraph = None
+
+    @property
+    def lead(self):
+        return ' '.join(self.paragraphs)
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'meta':
+            attrs = dict(attrs)
+            key = attrs.get('property') or attrs.get('name') or ''
+            field = META_FIELDS.get(key.lower()) or ('fallback_description' if key.lower() == 'description' else None)
+            if field and attrs.get('content'):
+                self.meta.setdefault(field, ' '.join(attrs['content'].split()))
+        elif tag in SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag in ('article', 'main') and not self._in_content:
+            self._in_content = True
+            self.paragraphs = []
+        elif tag == 'p' and not self._skipping:
+            self._paragraph = []
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skipping = max(0, self._skipping - 1)
+        elif tag == 'p' and self._paragraph is not None:
+            text = ' '.join(''.join(self._paragraph).split())
+            self._paragraph = None
+            if len(text) >= self.min_paragraph:
+                self.paragraphs.append(text)
+                if len(self.lead) >= self.lead_chars:
+                    self.done = True
+
+    def handle_data(self, data):
+        if self._paragraph is not None and not self._skipping:
+            self._paragraph.append(data)
+
+
+def page_encoding(content_type, head):
+    """Encoding of an HTML page, from its Content-Type, else its first bytes
+
+    Only an explicit charset in the header counts; requests' ISO-8859-1
+    default for text/* is ignored. Next comes a <meta> charset declaration;
+    without one, a ``head`` that is valid UTF-8 is taken as such, and anything
+    else goes to detection (what ``apparent_encoding`` would do on the whole
+    body).
+    """
+    candidates = []
+    match = HEADER_CHARSET_RE.search(content_type or '')
+    if match:
+        candidates.append(match.group(1))
+    match = META_CHARSET_RE.search(head[:4096])
+    if match:
+        candidates.append(match.group(1).decode('ascii'))
+    try:
+        # A multi-byte character cut off at the end of ``head`` is fine
+        codecs.getincrementaldecoder('utf-8')().decode(head)
+        candidates.append('utf-8')
+    except UnicodeDecodeError:
+        from requests.compat import chardet
+        candidates.append(chardet.detect(head)['encoding'])
+
+    for candidate in candidates:
+        try:
+            if candidate:
+                return codecs.lookup(candidate).name
+        except LookupError:
+            continue
+    return 'utf-8'
+
+
+def truncate(text, limit=300):
+    """Cut at a word boundary, as feed summaries are"""
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(' ', 1)[0] + '...'
+
+
+class EnrichmentCache:
+    """Extracted page data keyed by URL, zlib-compressed in SQLite
+
+    Pages that answered with a client error are remembered as such (an empty
+    record), so they are not fetched again either.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            'url TEXT PRIMARY KEY, fetched_at REAL NOT NULL, status INTEGER NOT NULL, data BLOB)'
+        )
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """The stored page dict, ``{}`` for a page that failed, None if unseen"""
+        with self._lock:
+            row = self._conn.execute('SELECT data FROM pages WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0])) if row[0] else {}
+
+    def put(self, url, page, status=200):
+        data = zlib.compress(json.dumps(page).encode('utf-8')) if page else None
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages (url, fetched_at, status, data) VALUES (?, ?, ?, ?)',
+                (url, time.time(), status, data)
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ArticleEnricher:
+    """Fills in article summaries from the linked pages, in the background
+
+    ``submit`` returns at once; pages are fetched on a small thread pool with
+    at most ``per_host`` requests to any one host at a time, and the articles
+    are updated in place as results come in. Every page goes through the
+    cache, so it is fetched at most once however many articles, digests or
+    processes refer to it. With a ``store``, stored articles are only
+    changed through ``ArticleStore.update``, under the store's lock.
+    """
+
+    def __init__(self, cache, per_host=2, max_workers=8, timeout=10, max_bytes=512 * 1024, store=None):
+        self.cache = cache
+        self.store = store
+        self.per_host = per_host
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.http = FeedHTTPClient(headers={
+            **DEFAULT_HEADERS,
+            'Accept': 'text/html,application/xhtml+xml;q=0.9,*/*;q=0.8',
+        })
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='enrich')
+
+        self._waiters = {}  # url -> articles waiting for it
+        self._queues = {}   # host -> deque of URLs not started yet
+        self._active = {}   # host -> requests in flight
+        self._lock = threading.Lock()
+
+    def submit(self, articles):
+        """Enrich articles from the cache now, or once their page is fetched"""
+        for article in articles:
+            url = article.get('link')
+            if not url or urlparse(url).scheme not in ('http', 'https'):
+                continue
+            page = self.cache.get(url)
+            if page is not None:
+                PAGES_ENRICHED.inc(result='cache_hit')
+                if page:
+                    self._update(article, page)
+                continue
+
+            with self._lock:
+                waiting = self._waiters.get(url)
+                if waiting is not None:
+                    waiting.append(article)  # Already queued or in flight
+                    continue
+                self._waiters[url] = [article]
+                host = urlparse(url).netloc
+                self._queues.setdefault(host, deque()).append(url)
+                self._start(host)
+
+    def _start(self, host):
+        """Start queued fetches for a host up to its limit (lock held)"""
+        queue = self._queues.get(host)
+        while queue and self._active.get(host, 0) < self.per_host:
+            self._active[host] = self._active.get(host, 0) + 1
+            self._executor.submit(self._run, host, queue.popleft())
+        if queue is not None and not queue:
+            del self._queues[host]
+
+    def _run(self, host, url):
+        page = None
+        try:
+            page = self._fetch(url)
+            PAGES_ENRICHED.inc(result='fetched' if page else 'failed')
+        except Exception as e:
+            PAGES_ENRICHED.inc(result='failed')
+            logger.warning(f"Could not enrich {url}: {e}")
+        finally:
+            with self._lock:
+                articles = self._waiters.pop(url, [])
+                self._active[host] -= 1
+                if not self._active[host]:
+                    del self._active[host]
+                self._start(host)
+        if page:
+            for article in articles:
+                self._update(article, page)
+
+    def _fetch(self, url):
+        """Fetch and extract a page, caching the outcome unless it was transient"""
+        response = self.http.get(url, timeout=self.timeout, conditional=False, stream=True)
+        with response:
+            if 400 <= response.status_code < 500:
+                self.cache.put(url, {}, status=response.status_code)
+                return {}
+            response.raise_for_status()
+            if 'html' not in response.headers.get('Content-Type', 'text/html'):
+                self.cache.put(url, {}, status=response.status_code)
+                return {}
+
+            extractor = _LeadExtractor()
+            received = 0
+            decoder = None
+            for chunk in response.iter_content(chunk_size=16384):
+                if decoder is None:
+                    # One decoder for the whole body, so multi-byte characters
+                    # split across chunks come out whole
+                    encoding = page_encoding(response.headers.get('Content-Type'), chunk)
+                    decoder = codecs.getincrementaldecoder(encoding)('replace')
+                received += len(chunk)
+                extractor.feed(decoder.decode(chunk))
+                if extractor.done or received >= self.max_bytes:
+                    break  # Only the head and the lead are needed
+            if decoder is not None:
+                extractor.feed(decoder.decode(b'', final=True))
+            extractor.close()
+
+        page = dict(extractor.meta)
+        if 'description' not in page and 'fallback_description' in page:
+            page['description'] = page['fallback_description']
+        page.pop('fallback_description', None)
+        if page.get('image'):
+            page['image'] = urljoin(url, page['image'])
+        page['lead'] = truncate(extractor.lead, 600)
+        self.cache.put(url, page)
+        return page
+
+    def _update(self, article, page):
+        if self.store is None:
+            self.apply(article, page)
+        else:
+            self.store.update(article_key(article), lambda stored: self.apply(stored, page))
+
+    @staticmethod
+    def apply(article, page):
+        """Update an article from page data where the page says more"""
+        description = page.get('description') or ''
+        lead = page.get('lead') or ''
+        # A curated og:description beats the first paragraph, unless it's a
+        # one-liner
+        best = description if len(description) >= 80 or not lead else lead
+        if len(best) > len(article.get('summary') or ''):
+            article['summary'] = truncate(best)
+        if not article.get('title') and page.get('title'):
+            article['title'] = page['title']
+        if page.get('image'):
+            article.setdefault('image', page['image'])
+        article['enriched'] = True
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.http.close()
+        self.cache.close()
@@ -0,0 +1,102 @@
+import xml.etree.ElementTree as ET
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+
+# Namespaces are resolved once here: ElementTree reports fully qualified tag
+# names, so every lookup below is a single dict hit instead of a find() call
+ITEM_TAGS = frozenset(['item', f'{ATOM_NS}entry'])
+
+# tag -> (field, priority); lower priority wins when a feed carries several
+FIELD_TAGS = {
+    'title': ('title', 0),
+    f'{ATOM_NS}title': ('title', 1),
+    'link': ('link', 0),
+    f'{ATOM_NS}link': ('link', 1),
+    'description': ('summary', 0),
+    f'{ATOM_NS}summary': ('summary', 1),
+    f'{ATOM_NS}content': ('summary', 2),
+    'pubDate': ('published', 0),
+    f'{ATOM_NS}published': ('published', 1),
+    f'{ATOM_NS}updated': ('published', 2),
+}
+
+
+def _link_value(elem):
+    """Return the URL of an RSS <link> or Atom <link href> element"""
+    if elem.text and elem.text.strip():
+        return elem.text.strip()
+    if elem.get('rel', 'alternate') != 'alternate':
+        return None
+    return elem.get('href')
+
+
+class _EntryBuilder:
+    """Collects the fields of the item currently being parsed"""
+
+    def __init__(self):
+        self.values = {}
+        self.priorities = {}
+
+    def offer(self, field, priority, value):
+        if value is None:
+            return
+        if field in self.priorities and self.priorities[field] <= priority:
+            return
+        self.values[field] = value
+        self.priorities[field] = priority
+
+    def build(self):
+        return {
+            'title': self.values.get('title') or '',
+            'link': self.values.get('link') or '',
+            'summary': self.values.get('summary') or '',
+            'published': self.values.get('published') or '',
+        }
+
+
+def iter_feed_entries(chunks):
+    """Incrementally parse an RSS or Atom document into entry dicts
+
+    ``chunks`` is any iterable of bytes (e.g. ``response.iter_content()``).
+    Entries are yielded as soon as their closing tag is seen, and each parsed
+    item is detached from the tree, so memory stays proportional to one item.
+    Closing the generator early stops reading the remaining chunks.
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    stack = []
+    current = None
+
+    def drain():
+        nonlocal current
+        for event, elem in parser.read_events():
+            tag = elem.tag
+            if event == 'start':
+                stack.append(elem)
+                if tag in ITEM_TAGS:
+                    current = _EntryBuilder()
+                continue
+
+            stack.pop()
+            if current is None:
+                continue
+
+            if tag in ITEM_TAGS:
+                entry = current.build()
+                current = None
+                elem.clear()
+                if stack:
+                    stack[-1].remove(elem)
+                yield entry
+                continue
+
+            field_info = FIELD_TAGS.get(tag)
+            if field_info:
+                field, priority = field_info
+                value = _link_value(elem) if field == 'link' else elem.text
+                current.offer(field, priority, value)
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from drain()
+    parser.close()
+    yield from drain()
@@ -0,0 +1,216 @@
+from collections import OrderedDict
+from html.entities import html5
+from html.parser import HTMLParser
+import hashlib
+import threading
+
+# Elements whose content never makes it into the cleaned text
+SKIPPED_TAGS = frozenset(['script', 'style', 'figure', 'img'])
+
+# The rules below mirror how BeautifulSoup's html.parser builder shapes the
+# tree, so get_text() output is reproduced without building it:
+# void elements are closed immediately, text under these containers is a
+# non-text string class, and whitespace inside these tags is kept verbatim
+VOID_TAGS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link',
+    'menuitem', 'meta', 'param', 'source', 'track', 'wbr',
+    'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex', 'nextid', 'spacer'
+])
+STRING_CONTAINER_TAGS = frozenset(['rt', 'rp', 'style', 'script', 'template'])
+PRESERVE_WHITESPACE_TAGS = frozenset(['pre', 'textarea'])
+ASCII_SPACES = '\x20\x0a\x09\x0c\x0d'
+
+
+class _TextExtractor(HTMLParser):
+    """Collects text nodes in one streaming pass, skipping unwanted elements"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts = []
+        self.pending = []
+        self.stack = []
+        self.closed_void = []
+        self.skip_depth = 0
+        self.container_depth = 0
+        self.preserve_depth = 0
+
+    def _flush(self, text_node=True, cdata=False):
+        """End the current text segment and keep it if it would be visible"""
+        if not self.pending:
+            return
+        data = ''.join(self.pending)
+        self.pending = []
+        if not text_node or self.skip_depth:
+            return
+        if self.container_depth and not cdata:
+            return
+        if not self.preserve_depth and all(char in ASCII_SPACES for char in data):
+            data = '\n' if '\n' in data else ' '
+        self.parts.append(data)
+
+    def _push(self, tag):
+        self.stack.append(tag)
+        self._adjust(tag, 1)
+
+    def _adjust(self, tag, delta):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += delta
+        if tag in STRING_CONTAINER_TAGS:
+            self.container_depth += delta
+        if tag in PRESERVE_WHITESPACE_TAGS:
+            self.preserve_depth += delta
+
+    def _pop_to(self, tag):
+        """Close the most recent open ``tag`` and everything opened after it"""
+        if tag not in self.stack:
+            return
+        while self.stack:
+            popped = self.stack.pop()
+            self._adjust(popped, -1)
+            if popped == tag:
+                break
+
+    def handle_starttag(self, tag, attrs, void_closes=True):
+        self._flush()
+        self._push(tag)
+        if tag in VOID_TAGS and void_closes:
+            self._pop_to(tag)
+            self.closed_void.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, void_closes=False)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag in self.closed_void:
+            self.closed_void.remove(tag)
+        else:
+            self._pop_to(tag)
+
+    def handle_data(self, data):
+        self.pending.append(data)
+
+    def handle_charref(self, name):
+        if name[:1] in ('x', 'X'):
+            codepoint = int(name.lstrip('xX'), 16)
+        else:
+            codepoint = int(name)
+
+        data = None
+        if codepoint < 256:
+            # Numeric references below 256 are often meant as Windows-1252
+            try:
+                data = bytes([codepoint]).decode('windows-1252')
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(codepoint)
+            except (ValueError, OverflowError):
+                pass
+        self.handle_data(data or '\N{REPLACEMENT CHARACTER}')
+
+    def handle_entityref(self, name):
+        self.handle_data(ENTITY_TO_CHARACTER.get(name, f'&{name}'))
+
+    def handle_comment(self, data):
+        self._flush()
+        self.pending.append(data)
+        self._flush(text_node=False)
+
+    def handle_decl(self, data):
+        self._flush()
+        self.pending.append(data)
+        self._flush(text_node=False)
+
+    def handle_pi(self, data):
+        self._flush()
+        self.pending.append(data)
+        self._flush(text_node=False)
+
+    def unknown_decl(self, data):
+        self._flush()
+        is_cdata = data.upper().startswith('CDATA[')
+        self.pending.append(data[len('CDATA['):] if is_cdata else data)
+        self._flush(text_node=is_cdata, cdata=True)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def _entity_table():
+    """Map entity names (with or without trailing semicolon) to characters"""
+    table = {}
+    for name, character in sorted(html5.items()):
+        name = name[:-1] if name.endswith(';') else name
+        table.setdefault(name, character)
+    return table
+
+
+ENTITY_TO_CHARACTER = _entity_table()
+
+
+def normalize_whitespace(text):
+    """Collapse line breaks and runs of spaces into single spaces"""
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+
+def strip_html(text):
+    """Remove HTML tags (and script/style/figure/img content) from text
+
+    Produces the same output as building a BeautifulSoup tree with
+    html.parser, decomposing those elements and calling get_text(), without
+    materializing the tree.
+    """
+    if not text:
+        return ""
+
+    # Plain text (no markup, no entities) only needs whitespace cleanup
+    if '<' not in text and '&' not in text:
+        return normalize_whitespace(text)
+
+    extractor = _TextExtractor()
+    extractor.feed(text)
+    extractor.close()
+    return normalize_whitespace(''.join(extractor.parts))
+
+
+class HTMLCleaner:
+    """strip_html with a bounded LRU cache keyed by content hash
+
+    Feeds repeat the same summaries on every polling cycle, so most calls are
+    answered from the cache without parsing.
+    """
+
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def clean(self, text):
+        """Return the cleaned text for an HTML snippet"""
+        if not text:
+            return ""
+
+        key = hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        cleaned = strip_html(text)
+
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = cleaned
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return cleaned
@@ -0,0 +1,291 @@
+from collections import deque
+from concurrent.futures import wait
+import logging
+import os
+import threading
+import time
+from article_store import article_key, article_time
+from metrics import STAGE_SECONDS
+from snapshot import read_snapshot, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class SourceSchedule:
+    """Polling state for one source, adapted to how often it publishes
+
+    The recent publish times of newly seen articles give the source's typical
+    spacing between posts; the source is polled a couple of times per expected
+    post, within [min_interval, max_interval]. Sources that go quiet back off
+    towards max_interval.
+    """
+
+    def __init__(self, name, kind, min_interval, max_interval, polls_per_post=2):
+        self.name = name
+        self.kind = kind  # 'feed' or 'company'
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.polls_per_post = polls_per_post
+        self.interval = min_interval
+        self.next_due = 0.0  # monotonic; 0 means poll right away
+        self.publish_times = deque(maxlen=20)
+        self.last_polled = None
+
+    def is_due(self, now):
+        return now >= self.next_due
+
+    def observe(self, new_articles, now):
+        """Update the interval after a successful poll"""
+        self.last_polled = now
+        for article in new_articles:
+            published = article_time(article)
+            if published is not None:
+                self.publish_times.append(published.timestamp())
+
+        if new_articles and len(self.publish_times) >= 2:
+            times = sorted(self.publish_times)
+            spacing = (times[-1] - times[0]) / (len(times) - 1)
+            self.interval = spacing / self.polls_per_post
+        elif not new_articles:
+            # Nothing new: slow down gradually
+            self.interval *= 1.5
+        self.interval = max(self.min_interval, min(self.max_interval, self.interval))
+        self.next_due = now + self.interval
+
+    def observe_failure(self, now):
+        """Retry a failed source soon, without hammering it"""
+        self.next_due = now + self.min_interval
+
+    def snapshot(self, now):
+        return {
+            'interval': self.interval,
+            'due_in': self.next_due - now,
+            'publish_times': list(self.publish_times),
+        }
+
+    def restore(self, state, now, elapsed):
+        """Resume a snapshot taken ``elapsed`` seconds ago"""
+        self.interval = max(self.min_interval, min(self.max_interval, state['interval']))
+        self.next_due = now + max(0.0, state['due_in'] - elapsed)
+        self.publish_times.extend(state['publish_times'])
+
+
+class IngestionPipeline:
+    """Polls every source on its own schedule and fills the article store
+
+    ``poll_due`` is blocking and meant to be called periodically from a worker
+    thread; it fetches only the sources whose interval has elapsed.
+
+    With ``snapshot_path``, the store, the scrapers' validators and parses
+    and the schedules are saved there by ``save_snapshot`` and read back on
+    first use, so a restarted bot answers from where it left off instead of
+    scraping everything cold.
+
+    With an ``enricher``, newly stored articles are handed to it for
+    background enrichment from their linked pages.
+
+    A ``read_only`` pipeline never fetches or writes the snapshot: its store
+    follows the snapshot another process's pipeline writes, through
+    ``reload_snapshot``.
+    """
+
+    def __init__(self, scraper, company_scraper, store, window_hours=48,
+                 min_interval=300, max_interval=21600, snapshot_path=None,
+                 snapshot_interval=300, enricher=None, read_only=False):
+        self.scraper = scraper
+        self.company_scraper = company_scraper
+        self.store = store
+        self.window_hours = window_hours
+        self.schedules = {}
+        for name in scraper.sources:
+            self.schedules[name] = SourceSchedule(name, 'feed', min_interval, max_interval)
+        for name in company_scraper.company_sources:
+            self.schedules[name] = SourceSchedule(name, 'company', min_interval, max_interval)
+        self.enricher = enricher
+        self.read_only = read_only
+        self.warmed = False
+        self._lock = threading.Lock()
+
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self._restored = snapshot_path is None
+        self._restore_lock = threading.Lock()
+        self._snapshot_mtime = None
+        # The first snapshot is written as soon as there is data, so readers
+        # don't wait a whole interval for it
+        self._snapshot_saved = float('-inf')
+
+    @property
+    def feed_source_ids(self):
+        return frozenset(name for name, schedule in self.schedules.items() if schedule.kind == 'feed')
+
+    @property
+    def company_source_ids(self):
+        return frozenset(name for name, schedule in self.schedules.items() if schedule.kind == 'company')
+
+    def ensure_warm(self):
+        """Restore the last snapshot, or run a first full poll without one
+
+        A read-only pipeline only picks up a newer snapshot, if there is one.
+        """
+        if self.read_only:
+            self.reload_snapshot()
+            return
+        self.restore_snapshot()
+        if not self.warmed:
+            self.poll_due()
+
+    def restore_snapshot(self):
+        """Load the snapshot on first call; later calls return at once"""
+        if self._restored:
+            return
+        with self._restore_lock:
+            if self._restored:
+                return
+            self._restored = True
+            self._load_snapshot()
+
+    def reload_snapshot(self):
+        """Load the snapshot if it was rewritten since it was last read
+
+        Returns True if a newer snapshot was loaded.
+        """
+        if self.snapshot_path is None:
+            return False
+        try:
+            mtime = os.stat(self.snapshot_path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        with self._restore_lock:
+            self._restored = True
+            if mtime == self._snapshot_mtime:
+                return False
+            return self._load_snapshot()
+
+    def _load_snapshot(self):
+        """Replace the pipeline's state with the snapshot's (restore lock held)"""
+        started = time.monotonic()
+        try:
+            mtime = os.stat(self.snapshot_path).st_mtime_ns
+            state = read_snapshot(self.snapshot_path)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.error(f"Could not read snapshot {self.snapshot_path}: {e}")
+            return False
+        self._snapshot_mtime = mtime
+        if state is None:
+            return False
+
+        with self._lock:
+            if not self.store.restore(state['store']):
+                logger.warning("Snapshot was taken with other clustering settings, starting cold")
+                return False
+            elapsed = max(0.0, time.time() - state['saved_at'])
+            if not self.read_only:
+                # Fetch state only matters to a pipeline that fetches
+                self.scraper.restore(state['feeds'])
+                self.company_scraper.restore(state['companies'])
+                now = time.monotonic()
+                for name, schedule_state in state['schedules'].items():
+                    schedule = self.schedules.get(name)
+                    if schedule is not None:
+                        schedule.restore(schedule_state, now, elapsed)
+            self.warmed = True
+
+        logger.info(
+            f"Restored {len(self.store)} articles from a snapshot taken {elapsed / 60:.0f} min ago "
+            f"in {(time.monotonic() - started) * 1000:.0f} ms"
+        )
+        return True
+
+    def save_snapshot(self, force=False):
+        """Write a snapshot if ``snapshot_interval`` has passed (or ``force``)
+
+        Nothing is written before the pipeline has data, so an idle process
+        never replaces a useful snapshot with an empty one.
+        """
+        if self.snapshot_path is None or self.read_only or not self.warmed:
+            return
+        now = time.monotonic()
+        if not force and now - self._snapshot_saved < self.snapshot_interval:
+            return
+        try:
+            with self._lock:
+                state = {
+                    'saved_at': time.time(),
+                    'store': self.store.snapshot(),
+                    'feeds': self.scraper.snapshot(),
+                    'companies': self.company_scraper.snapshot(),
+                    'schedules': {
+                        name: schedule.snapshot(now) for name, schedule in self.schedules.items()
+                    },
+                }
+                size = write_snapshot(self.snapshot_path, state)
+            self._snapshot_saved = now
+            logger.debug(f"Wrote {size} byte snapshot to {self.snapshot_path}")
+        except Exception as e:
+            logger.error(f"Could not write snapshot {self.snapshot_path}: {e}")
+
+    def poll_due(self):
+        """Fetch every due source and store its new articles
+
+        Returns the number of new articles stored.
+        """
+        self.restore_snapshot()
+        with self._lock:
+            now = time.monotonic()
+            due = [schedule for schedule in self.schedules.values() if schedule.is_due(now)]
+            if not due:
+                return 0
+
+            # Company pages and feeds are fetched side by side on the
+            # scraper's thread pool
+            executor = self.scraper._get_executor()
+            company_futures = {
+                executor.submit(self.company_scraper.scrape_source, schedule.name): schedule.name
+                for schedule in due if schedule.kind == 'company'
+            }
+            feed_sources = {
+                schedule.name: self.scraper.sources[schedule.name]
+                for schedule in due if schedule.kind == 'feed'
+            }
+
+            results = {}
+            if feed_sources:
+                for name, entries in self.scraper.fetch_all_sources(self.window_hours, sources=feed_sources).items():
+                    results[name] = [self.scraper.normalize_entry(entry, name) for entry in entries]
+
+            done, _ = wait(company_futures, timeout=self.scraper.overall_timeout)
+            for future in done:
+                name = company_futures[future]
+                try:
+                    results[name] = list(future.result())
+                except Exception as e:
+                    logger.error(f"Error scraping {name}: {e}")
+
+            finished = time.monotonic()
+            total_new = 0
+            stored = []
+            for schedule in due:
+                articles = results.get(schedule.name)
+                if articles is None:
+                    schedule.observe_failure(finished)
+                    continue
+                for article in articles:
+                    article['source_id'] = schedule.name
+                new_articles = self.store.add(articles)
+                schedule.observe(new_articles, finished)
+                stored.extend(article for article in new_articles if article_key(article) in self.store)
+                total_new += len(new_articles)
+                logger.info(
+                    f"Ingested {len(new_articles)} new from {schedule.name}; "
+                    f"next poll in {schedule.interval / 60:.0f} min"
+                )
+
+            if self.enricher is not None and stored:
+                self.enricher.submit(stored)
+
+            self.warmed = True
+            STAGE_SECONDS.observe(time.monotonic() - now, stage='ingest')
+            return total_new
@@ -0,0 +1,118 @@
+import json
+import re
+
+# Focus on actual AI product releases and company announcements
+DEFAULT_INCLUDE_KEYWORDS = [
+    # Company releases
+    'openai', 'anthropic', 'google ai', 'microsoft ai', 'meta ai', 'nvidia ai',
+    'chatgpt', 'claude', 'gemini', 'copilot', 'bard', 'llama',
+
+    # Product releases
+    'releases', 'launches', 'announces', 'unveils', 'introduces',
+    'new model', 'ai model', 'language model', 'llm',
+
+    # Specific AI products/agents
+    'ai agent', 'ai assistant', 'chatbot', 'voice assistant',
+    'gpt-4', 'gpt-5', 'claude-3', 'gemini pro', 'dall-e', 'midjourney',
+
+    # AI capabilities
+    'multimodal', 'text-to-image', 'text-to-video', 'code generation',
+    'reasoning', 'function calling', 'tool use',
+
+    # Business/funding
+    'funding', 'investment', 'valuation', 'startup', 'acquisition',
+    'partnership', 'collaboration',
+]
+
+# Exclude academic/research terms
+DEFAULT_EXCLUDE_KEYWORDS = [
+    'paper', 'research', 'study', 'arxiv', 'conference',
+    'journal', 'publication', 'dataset', 'benchmark'
+]
+
+
+def _trie_pattern(words):
+    """Build a regex alternation shaped like a trie over ``words``
+
+    Shared prefixes are factored out, so the regex engine branches on one
+    character at a time and the cost per text position depends on keyword
+    length rather than on how many keywords there are.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def render(node):
+        terminal = '' in node
+        branches = [re.escape(char) + render(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        # Greedy optional: the longest keyword at a position is tried first
+        return group + '?' if terminal else group
+
+    return render(trie)
+
+
+class KeywordMatcher:
+    """Finds every include/exclude keyword in a text with one regex pass
+
+    Matching keeps the substring semantics of ``keyword in text``: a zero-width
+    lookahead finds the longest keyword starting at every position, and any
+    shorter keywords that are prefixes of it are added from a table built at
+    construction time.
+    """
+
+    def __init__(self, include=None, exclude=None):
+        self.include = self._normalize(DEFAULT_INCLUDE_KEYWORDS if include is None else include)
+        self.exclude = self._normalize(DEFAULT_EXCLUDE_KEYWORDS if exclude is None else exclude)
+
+        terms = set(self.include) | set(self.exclude)
+        self._include_set = frozenset(self.include)
+        self._exclude_set = frozenset(self.exclude)
+        self._prefixes = {
+            term: tuple(term[:i] for i in range(1, len(term) + 1) if term[:i] in terms)
+            for term in terms
+        }
+        self._regex = re.compile('(?=(' + _trie_pattern(terms) + '))') if terms else None
+
+    @staticmethod
+    def _normalize(words):
+        seen = {}
+        for word in words:
+            word = word.strip().lower()
+            if word:
+                seen[word] = None
+        return list(seen)
+
+    @classmethod
+    def from_file(cls, path):
+        """Load keyword lists from a JSON file with "include"/"exclude" arrays"""
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        return cls(config.get('include'), config.get('exclude'))
+
+    def find(self, text):
+        """Return (matched include keywords, matched exclude keywords)"""
+        included = set()
+        excluded = set()
+        if not text or self._regex is None:
+            return included, excluded
+
+        found = set()
+        for match in self._regex.finditer(text.lower()):
+            found.add(match.group(1))
+
+        for longest in found:
+            for term in self._prefixes[longest]:
+                if term in self._include_set:
+                    included.add(term)
+                if term in self._exclude_set:
+                    excluded.add(term)
+        return included, excluded
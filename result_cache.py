@@ -0,0 +1,57 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightCache:
+    """TTL cache in front of a slow synchronous loader
+
+    The loader runs in a worker thread so the event loop stays free. While a
+    refresh is in flight, every caller awaits that same refresh instead of
+    starting its own; once it lands, callers get the cached value until
+    ``ttl`` seconds have passed.
+    """
+
+    def __init__(self, loader, ttl=300):
+        self.loader = loader
+        self.ttl = ttl
+        self.value = None
+        self.fetched_at = None  # aware UTC datetime of the last refresh
+        self._loaded_at = None  # monotonic time of the last refresh
+        self._inflight = None
+
+    def is_fresh(self):
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    async def get(self):
+        """Return (value, fetched_at), refreshing at most once at a time"""
+        if self.is_fresh():
+            return self.value, self.fetched_at
+
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._refresh())
+        # Shield the shared refresh: one caller giving up must not cancel it
+        return await asyncio.shield(self._inflight)
+
+    async def _refresh(self):
+        try:
+            value = await asyncio.to_thread(self.loader)
+        except Exception as e:
+            if self._loaded_at is None:
+                raise
+            logger.error(f"Refresh failed, serving stale result: {e}")
+            return self.value, self.fetched_at
+        finally:
+            self._inflight = None
+
+        self.value = value
+        self.fetched_at = datetime.now(timezone.utc)
+        self._loaded_at = time.monotonic()
+        return self.value, self.fetched_at
+
+    def invalidate(self):
+        """Force the next get() to refresh"""
+        self._loaded_at = None
@@ -0,0 +1,38 @@
+import logging
+import os
+import pickle
+import zlib
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'AISNAP1'
+
+
+def write_snapshot(path, state):
+    """Write ``state`` as a zlib-compressed pickle; returns the size in bytes
+
+    The file is replaced atomically, so a reader (or another process writing
+    the same snapshot) never sees a partial one.
+    """
+    data = MAGIC + zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), 6)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def read_snapshot(path):
+    """Read a snapshot written by ``write_snapshot``, or None if there is none
+
+    Snapshots are pickles: only load files this bot wrote itself.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    if not data.startswith(MAGIC):
+        raise ValueError("not a snapshot file")
+    return pickle.loads(zlib.decompress(data[len(MAGIC):]))
@@ -0,0 +1,98 @@
+from collections import deque
+import random
+import threading
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class SourceHealth:
+    """Latency history and circuit breaker for one source
+
+    Successful fetch times give the source's own timeout: a multiple of its
+    p95 latency, within [min_timeout, max_timeout], so a source that usually
+    answers in 300 ms isn't given 15 s to fail. Until ``min_samples`` fetches
+    have been timed, ``max_timeout`` applies.
+
+    After ``failure_threshold`` consecutive failed attempts the circuit opens
+    and the source is skipped for ``base_backoff`` seconds, doubling on each
+    reopening up to ``max_backoff``. Once the backoff has passed a single
+    trial attempt is let through; success closes the circuit again.
+    """
+
+    def __init__(self, min_timeout=2.0, max_timeout=15.0, headroom=3.0, window=50,
+                 min_samples=5, failure_threshold=3, base_backoff=60.0, max_backoff=3600.0):
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.headroom = headroom
+        self.min_samples = min_samples
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        self.latencies = deque(maxlen=window)
+        self.state = CLOSED
+        self.failures = 0    # consecutive failed attempts
+        self.backoff = 0.0   # current open period; 0 while healthy
+        self.open_until = 0.0
+        self._lock = threading.Lock()
+
+    def observe_latency(self, seconds):
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def percentile(self, fraction):
+        """Latency percentile of recent successful fetches, or None"""
+        with self._lock:
+            if len(self.latencies) < self.min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+    def timeout(self, attempt=0):
+        """Seconds allowed for a fetch; each retry gets twice as long"""
+        p95 = self.percentile(0.95)
+        timeout = self.max_timeout if p95 is None else p95 * self.headroom
+        return max(self.min_timeout, min(self.max_timeout, timeout * 2 ** attempt))
+
+    def hedge_delay(self):
+        """How long to wait on a fetch before sending a second one, or None
+
+        The source's p95 latency, but never under half ``min_timeout``: 304s
+        make p95 tiny, and a full download a few milliseconds slower is not
+        worth a duplicate request.
+        """
+        p95 = self.percentile(0.95)
+        return None if p95 is None else max(p95, self.min_timeout / 2)
+
+    def allow(self, now):
+        """Whether an attempt may be made now (``now`` is monotonic)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and now >= self.open_until:
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.backoff = 0.0
+
+    def record_failure(self, now):
+        """Count a failed attempt; returns True if this opened the circuit"""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.backoff = min(self.max_backoff, self.backoff * 2 or self.base_backoff)
+                self.open_until = now + self.backoff
+                self.state = OPEN
+                return True
+            return False
+
+    def retry_delay(self, attempt):
+        """Jittered exponential backoff before retry number ``attempt`` (1-based)"""
+        return random.uniform(0.5, 1.0) * min(self.min_timeout, 0.5 * 2 ** (attempt - 1))
@@ -0,0 +1,165 @@
+from array import array
+import hashlib
+import re
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-.'][a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in into is it its of on or that the
+this to was were will with you your we our their they he she after about over
+new says said more than can just now how what why who when which also not but
+""".split())
+
+
+def tokenize(text):
+    """Lowercased content words of a title/summary"""
+    return {token for token in TOKEN_RE.findall(text.lower())
+            if len(token) > 1 and token not in STOPWORDS}
+
+
+class StoryClusterer:
+    """Groups near-duplicate stories with MinHash locality-sensitive hashing
+
+    Each story's title+summary tokens get a MinHash signature split into
+    bands; stories sharing any band land in the same bucket and become
+    candidates. Only candidates are compared, so assigning a new story costs
+    one signature plus a few bucket lookups, not a pass over every story.
+    Buckets hold cluster representatives only.
+
+    Short texts share most of their words by chance, so a story needs
+    ``min_tokens`` content words to be clustered at all, and a candidate
+    must be at least ``threshold`` similar. Two launches by one company can
+    still share most of their wording, so each headline must also have
+    ``headline_overlap`` of its words in the other story's text: "OpenAI
+    launches Sora video app" is not covered by a GPT-5 story.
+    """
+
+    def __init__(self, num_perm=64, bands=32, threshold=0.6, min_tokens=6, headline_overlap=0.7, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.min_tokens = min_tokens
+        self.headline_overlap = headline_overlap
+
+        # Each 64-byte blake2b digest yields 16 independent 32-bit hash
+        # values; distinct salts per block give num_perm hash functions, and
+        # fixed salts keep signatures stable across runs
+        self._salts = [
+            hashlib.blake2b(f"{seed}:{block}".encode(), digest_size=16).digest()
+            for block in range(-(-num_perm // 16))
+        ]
+
+        self._signatures = {}  # representative key -> signature
+        self._buckets = {}     # (band, band values) -> set of representative keys
+        self._tokens = {}      # representative key -> (headline tokens, text tokens)
+
+    def signature(self, text):
+        """MinHash signature of a text, or None if it has no content words"""
+        return self._signature(tokenize(text))
+
+    def _signature(self, tokens):
+        if not tokens:
+            return None
+        rows = []
+        for token in tokens:
+            data = token.encode()
+            values = array('I')
+            for salt in self._salts:
+                values.frombytes(hashlib.blake2b(data, digest_size=64, salt=salt).digest())
+            rows.append(values)
+        # Column-wise minimum across tokens, computed in C
+        return tuple(map(min, zip(*rows)))[:self.num_perm]
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [(band, signature[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+
+    def similarity(self, left, right):
+        """Estimated Jaccard similarity of two signatures"""
+        return sum(1 for x, y in zip(left, right) if x == y) / self.num_perm
+
+    def _covers(self, headline, tokens):
+        """Whether enough of a headline's words appear in ``tokens``"""
+        return not headline or len(headline & tokens) >= self.headline_overlap * len(headline)
+
+    def assign(self, key, text, accept=None, headline=''):
+        """Place a story; return the key of the cluster it belongs to
+
+        ``text`` is the story's title and summary, ``headline`` its title.
+        Returns ``key`` itself when the story starts a new cluster (or is too
+        short to be clustered). ``accept``, if given, is called with a
+        candidate representative's key and vetoes joining that cluster by
+        returning false.
+        """
+        tokens = tokenize(text)
+        if len(tokens) < self.min_tokens:
+            return key
+        headline_tokens = tokenize(headline)
+        signature = self._signature(tokens)
+
+        band_keys = self._band_keys(signature)
+        candidates = set()
+        for band_key in band_keys:
+            candidates.update(self._buckets.get(band_key, ()))
+
+        best_key = None
+        best_score = self.threshold
+        for candidate in candidates:
+            if accept is not None and not accept(candidate):
+                continue
+            score = self.similarity(signature, self._signatures[candidate])
+            if score < best_score:
+                continue
+            candidate_headline, candidate_tokens = self._tokens[candidate]
+            if self._covers(headline_tokens, candidate_tokens) and self._covers(candidate_headline, tokens):
+                best_key, best_score = candidate, score
+        if best_key is not None:
+            return best_key
+
+        self._signatures[key] = signature
+        self._tokens[key] = (frozenset(headline_tokens), frozenset(tokens))
+        for band_key in band_keys:
+            self._buckets.setdefault(band_key, set()).add(key)
+        return key
+
+    def remove(self, key):
+        """Forget a cluster representative"""
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        del self._tokens[key]
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def snapshot(self):
+        """Representative signatures and tokens; buckets are rebuilt from them"""
+        return {
+            'salts': self._salts,
+            'bands': self.bands,
+            'signatures': dict(self._signatures),
+            'tokens': dict(self._tokens),
+        }
+
+    def restore(self, state):
+        """Load a snapshot taken with the same parameters
+
+        Returns False (and changes nothing) if the parameters differ, since
+        the signatures would not be comparable, or if the snapshot predates
+        headline tokens.
+        """
+        if state['salts'] != self._salts or state['bands'] != self.bands or 'tokens' not in state:
+            return False
+        self._signatures = dict(state['signatures'])
+        self._tokens = dict(state['tokens'])
+        self._buckets = {}
+        for key, signature in self._signatures.items():
+            for band_key in self._band_keys(signature):
+                self._buckets.setdefault(band_key, set()).add(key)
+        return True
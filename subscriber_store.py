@@ -0,0 +1,163 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriberStore:
+    """Persistent subscriber set backed by SQLite in WAL mode
+
+    ``add``/``discard`` only record the change in memory; a background thread
+    writes pending changes in one transaction every ``flush_interval`` seconds
+    (or sooner once ``batch_size`` changes pile up), so command handlers never
+    wait on disk. Startup just opens the database, whatever its size.
+    """
+
+    def __init__(self, path, batch_size=500, flush_interval=5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS subscribers ('
+            'chat_id INTEGER PRIMARY KEY, subscribed_at REAL NOT NULL)'
+        )
+
+        self._pending = {}  # chat_id -> True (subscribe) / False (unsubscribe)
+        self._writing = {}  # the batch being committed, still visible to readers
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        # Held from taking a batch until it is committed, so flushes commit
+        # in order and flush() only returns once every earlier change is on disk
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name='subscriber-flush', daemon=True)
+        self._flusher.start()
+
+    def add(self, chat_id):
+        """Subscribe a chat (written to disk in the next batch)"""
+        self._stage(chat_id, True)
+
+    def discard(self, chat_id):
+        """Unsubscribe a chat if subscribed (written in the next batch)"""
+        self._stage(chat_id, False)
+
+    def _stage(self, chat_id, subscribed):
+        with self._lock:
+            self._pending[chat_id] = subscribed
+            if len(self._pending) >= self.batch_size:
+                self._wake.set()
+
+    def __contains__(self, chat_id):
+        with self._lock:
+            for changes in (self._pending, self._writing):
+                if chat_id in changes:
+                    return changes[chat_id]
+        with self._db_lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM subscribers WHERE chat_id = ?', (chat_id,)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self):
+        self.flush()
+        with self._db_lock:
+            return self._conn.execute('SELECT COUNT(*) FROM subscribers').fetchone()[0]
+
+    def __bool__(self):
+        with self._lock:
+            if any(self._pending.values()):
+                return True
+        self.flush()
+        with self._db_lock:
+            return self._conn.execute('SELECT 1 FROM subscribers LIMIT 1').fetchone() is not None
+
+    def flush(self):
+        """Write all pending changes in a single transaction"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                pending = self._writing = self._pending
+                self._pending = {}
+            try:
+                self._write(pending)
+            finally:
+                with self._lock:
+                    self._writing = {}
+
+    def _write(self, pending):
+        """Commit one batch of changes (flush lock held)"""
+        now = time.time()
+        added = [(chat_id, now) for chat_id, subscribed in pending.items() if subscribed]
+        removed = [(chat_id,) for chat_id, subscribed in pending.items() if not subscribed]
+        try:
+            with self._db_lock:
+                self._conn.execute('BEGIN')
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO subscribers (chat_id, subscribed_at) VALUES (?, ?)', added
+                )
+                self._conn.executemany('DELETE FROM subscribers WHERE chat_id = ?', removed)
+                self._conn.execute('COMMIT')
+        except Exception as e:
+            logger.error(f"Error writing subscriber changes: {e}")
+            with self._db_lock:
+                if self._conn.in_transaction:
+                    self._conn.execute('ROLLBACK')
+            # Put the changes back unless newer ones superseded them
+            with self._lock:
+                for chat_id, subscribed in pending.items():
+                    self._pending.setdefault(chat_id, subscribed)
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def iter_chunks(self, size=1000):
+        """Yield subscriber chat IDs in ascending lists of at most ``size``
+
+        Uses keyset pagination, so only one chunk is in memory at a time and
+        concurrent subscribe/unsubscribe calls don't disturb the iteration.
+        """
+        self.flush()
+        last_id = None
+        while True:
+            with self._db_lock:
+                if last_id is None:
+                    rows = self._conn.execute(
+                        'SELECT chat_id FROM subscribers ORDER BY chat_id LIMIT ?', (size,)
+                    ).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        'SELECT chat_id FROM subscribers WHERE chat_id > ? ORDER BY chat_id LIMIT ?',
+                        (last_id, size)
+                    ).fetchall()
+            if not rows:
+                return
+            chunk = [row[0] for row in rows]
+            yield chunk
+            last_id = chunk[-1]
+
+    def __iter__(self):
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+    def close(self):
+        """Flush pending changes and close the database"""
+        self._closed = True
+        self._wake.set()
+        self._flusher.join(timeout=self.flush_interval + 1)
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
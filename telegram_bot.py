@@ -1,14 +1,21 @@
 import os
+import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from telegram import Update
 from telegram.ext import Application, CommandHandler, ContextTypes
 from telegram.constants import ParseMode
 from ai_news_scraper import AINewsScraper
 from company_news_scraper import CompanyNewsScraper
-import schedule
-import time
-import threading
+from broadcast import BroadcastDispatcher
+from digest import build_digest, pack_blocks, render_blocks
+from result_cache import SingleFlightCache
+from subscriber_store import SubscriberStore
+from topic_index import TopicIndex
+from article_store import ArticleStore
+from ingestion import IngestionPipeline
+from enrichment import ArticleEnricher, EnrichmentCache
+from metrics import MESSAGES_SENT, TELEGRAM_ERRORS, MetricsServer, span
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -22,11 +29,82 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class AINewsBot:
-    def __init__(self):
+    def __init__(self, ingest=True):
         self.bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
         self.scraper = AINewsScraper()
         self.company_scraper = CompanyNewsScraper()
-        self.subscribers = set()
+        
+        # Subscribers survive restarts; writes are batched off the hot path
+        self.data_dir = data_dir = os.getenv('BOT_DATA_DIR', 'data')
+        self.subscribers = SubscriberStore(os.path.join(data_dir, 'subscribers.db'))
+        
+        # Followed topics (from the keyword vocabulary) narrow a subscriber's
+        # broadcasts to matching articles
+        self.topics = TopicIndex(os.path.join(data_dir, 'subscribers.db'))
+        
+        # Telegram allows roughly 30 messages/second across all chats
+        self.broadcast_rate = float(os.getenv('BROADCAST_RATE', '25'))
+        self.broadcast_concurrency = int(os.getenv('BROADCAST_CONCURRENCY', '32'))
+        
+        # Background ingestion polls each source on its own adaptive schedule
+        # and fills the store that /latest and broadcasts read from. Its state
+        # is snapshotted every SNAPSHOT_INTERVAL seconds (0: never) and
+        # restored on first use after a restart. Without ``ingest`` nothing
+        # is fetched: the store follows the snapshot another process writes
+        self.ingest = ingest
+        snapshot_interval = float(os.getenv('SNAPSHOT_INTERVAL', '300'))
+        self.store = ArticleStore()
+        
+        # Optional: summaries from the linked pages' og: metadata and lead
+        # text, fetched once per URL into an on-disk cache
+        self.enricher = None
+        if ingest and os.getenv('ENRICH_ARTICLES', '').lower() in ('1', 'true', 'yes'):
+            self.enricher = ArticleEnricher(
+                EnrichmentCache(os.path.join(data_dir, 'enrichment.db')),
+                per_host=int(os.getenv('ENRICH_PER_HOST', '2')),
+                max_workers=int(os.getenv('ENRICH_WORKERS', '8')),
+                store=self.store
+            )
+        self.pipeline = IngestionPipeline(
+            self.scraper,
+            self.company_scraper,
+            self.store,
+            min_interval=float(os.getenv('INGEST_MIN_INTERVAL', '300')),
+            max_interval=float(os.getenv('INGEST_MAX_INTERVAL', '21600')),
+            snapshot_path=os.path.join(data_dir, 'snapshot.bin') if snapshot_interval else None,
+            snapshot_interval=snapshot_interval,
+            enricher=self.enricher,
+            read_only=not ingest
+        )
+        self.ingest_tick_seconds = float(os.getenv('INGEST_TICK_SECONDS', '60'))
+        
+        # Scheduled broadcasts: every UPDATE_INTERVAL_HOURS, shifted by up to
+        # UPDATE_JITTER_SECONDS so restarts don't synchronize with feeds
+        self.update_interval_hours = float(os.getenv('UPDATE_INTERVAL_HOURS', '6'))
+        self.update_jitter_seconds = int(os.getenv('UPDATE_JITTER_SECONDS', '120'))
+        # Company posts lead each update, but may not crowd out the feeds
+        self.max_company_posts = int(os.getenv('MAX_COMPANY_POSTS', '3'))
+        self._broadcast_lock = asyncio.Lock()
+        
+        # /latest is answered from a short-lived shared result, rendered once
+        self.latest_cache = SingleFlightCache(
+            self.load_latest,
+            ttl=float(os.getenv('LATEST_CACHE_TTL', '300'))
+        )
+        
+        # Prometheus-style /metrics endpoint, off unless METRICS_PORT is set
+        self.metrics_port = int(os.getenv('METRICS_PORT', '0'))
+        self.metrics_host = os.getenv('METRICS_HOST', '127.0.0.1')
+        
+        # BOT_MODE=webhook: Telegram pushes updates to WEBHOOK_URL and a pool
+        # of worker processes handles them; the default is long polling
+        self.bot_mode = os.getenv('BOT_MODE', 'polling').lower()
+        self.webhook_url = os.getenv('WEBHOOK_URL')
+        self.webhook_listen = os.getenv('WEBHOOK_LISTEN', '0.0.0.0')
+        self.webhook_port = int(os.getenv('WEBHOOK_PORT', '8443'))
+        self.webhook_secret = os.getenv('WEBHOOK_SECRET')
+        self.webhook_workers = int(os.getenv('WEBHOOK_WORKERS', str(os.cpu_count() or 2)))
+        self.webhook_concurrency = int(os.getenv('WEBHOOK_CONCURRENCY', '8'))
         
         if not self.bot_token:
             raise ValueError("TELEGRAM_BOT_TOKEN not found in environment variables")
@@ -45,6 +123,8 @@ Commands:
 /start - Subscribe to updates
 /stop - Unsubscribe from updates  
 /latest - Get latest AI news now
+/follow <topic> - Only get updates about a topic, e.g. /follow openai
+/topics - Show the topics you follow
 /help - Show this help message
 
 You'll receive automatic updates every 6 hours with the latest AI advancements!
@@ -57,60 +137,179 @@ You'll receive automatic updates every 6 hours with the latest AI advancements!
         """Handle /stop command"""
         chat_id = update.effective_chat.id
         self.subscribers.discard(chat_id)
+        self.topics.clear(chat_id)
         
         await update.message.reply_text(
             "You've been unsubscribed from AI updates. Use /start to subscribe again."
         )
         logger.info(f"Unsubscribed: {chat_id}")
     
+    @property
+    def topic_vocabulary(self):
+        """Topics that can be followed: the AI product keyword list"""
+        return self.scraper.keyword_matcher.include
+    
+    def article_topics(self, article):
+        """Topics an article matches, for routing to followers"""
+        text = f"{article.get('title', '')} {article.get('summary', '')}"
+        included, _ = self.scraper.keyword_matcher.find(text)
+        return included.union(article.get('keywords') or ())
+    
+    async def follow_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /follow <topic>"""
+        chat_id = update.effective_chat.id
+        term = ' '.join(context.args or []).strip().lower()
+        
+        if not term:
+            await update.message.reply_text(
+                "Usage: /follow <topic>\n\nTopics: " + ', '.join(self.topic_vocabulary)
+            )
+            return
+        if term not in self.topic_vocabulary:
+            await update.message.reply_text(f"Unknown topic '{term}'. Use /topics to see what you can follow.")
+            return
+        
+        # Following implies wanting updates
+        self.subscribers.add(chat_id)
+        if self.topics.follow(chat_id, term):
+            await update.message.reply_text(
+                f"✅ Following {term}. Your updates now only include articles about: "
+                + ', '.join(self.topics.topics(chat_id))
+            )
+            logger.info(f"{chat_id} follows {term}")
+        else:
+            await update.message.reply_text(f"You already follow {term}.")
+    
+    async def unfollow_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /unfollow <topic> and /unfollow all"""
+        chat_id = update.effective_chat.id
+        term = ' '.join(context.args or []).strip().lower()
+        
+        if not term:
+            await update.message.reply_text("Usage: /unfollow <topic> or /unfollow all")
+            return
+        if term == 'all':
+            self.topics.clear(chat_id)
+        elif not self.topics.unfollow(chat_id, term):
+            await update.message.reply_text(f"You don't follow {term}.")
+            return
+        
+        remaining = self.topics.topics(chat_id)
+        if remaining:
+            await update.message.reply_text(f"Unfollowed {term}. Still following: " + ', '.join(remaining))
+        else:
+            await update.message.reply_text("You no longer follow any topics and will get every update.")
+    
+    async def topics_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /topics"""
+        followed = self.topics.topics(update.effective_chat.id)
+        if followed:
+            text = "You follow: " + ', '.join(followed)
+        else:
+            text = "You don't follow any topics, so you get every update."
+        text += "\n\nAvailable topics: " + ', '.join(self.topic_vocabulary)
+        text += "\n\nUse /follow <topic> or /unfollow <topic>."
+        await update.message.reply_text(text)
+    
+    def collect_news(self, hours, channel=None, by_relevance=False, limit=10):
+        """Read RSS news and company announcements from the article store
+        
+        The store is filled by the background ingestion job; if it hasn't run
+        yet, a first poll is done here (blocking). ``channel`` scopes
+        de-duplication, so each delivery channel only gets articles it hasn't
+        delivered before; nothing is marked here, the caller marks what it
+        actually sent with ``mark_delivered``. At most ``limit`` articles are
+        returned (all of them with None), of which at most
+        ``max_company_posts`` company posts, the newest one of each company. Feed articles come newest first, or with
+        ``by_relevance`` the best keyword matches of the window first.
+        """
+        try:
+            self.pipeline.ensure_warm()
+        except Exception as e:
+            logger.error(f"Error during initial ingestion: {e}")
+        
+        with span('collect'):
+            company_news = self.store.recent(hours, source_ids=self.pipeline.company_source_ids)
+            if by_relevance:
+                articles = self.store.most_relevant(hours, source_ids=self.pipeline.feed_source_ids)
+            else:
+                articles = self.store.recent(hours, source_ids=self.pipeline.feed_source_ids)
+            
+            if channel is not None:
+                company_news = self.scraper.dedup.unseen(channel, company_news)
+                articles = self.scraper.dedup.unseen(channel, articles)
+            company_news = self._newest_per_source(company_news, self.max_company_posts)
+        
+        # Combine and prioritize company announcements
+        return (company_news + articles)[:limit]
+    
+    @staticmethod
+    def _newest_per_source(articles, limit):
+        """First article of each source, up to ``limit`` (input newest first)"""
+        picked = {}
+        for article in articles:
+            if len(picked) >= limit:
+                break
+            picked.setdefault(article.get('source_id'), article)
+        return list(picked.values())
+    
+    def mark_delivered(self, channel, articles):
+        """Remember articles as delivered on ``channel`` and persist that"""
+        self.scraper.dedup.mark(channel, articles)
+        self.scraper.dedup.save()
+    
+    def load_latest(self):
+        """The last 48 hours' articles for /latest and their rendered blocks"""
+        articles = self.collect_news(48)
+        with span('render'):
+            return articles, render_blocks(self.scraper.format_article_message, articles)
+    
+    @staticmethod
+    def format_age(fetched_at):
+        """Describe how long ago a result was fetched, e.g. '3 min ago'"""
+        seconds = int((datetime.now(timezone.utc) - fetched_at).total_seconds())
+        if seconds < 60:
+            return "just now"
+        if seconds < 3600:
+            return f"{seconds // 60} min ago"
+        return f"{seconds // 3600} h ago"
+    
     async def latest_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /latest command"""
-        await update.message.reply_text("🔍 Scanning for latest AI advancements...")
+        if not self.latest_cache.is_fresh():
+            await update.message.reply_text("🔍 Scanning for latest AI advancements...")
         
         try:
-            # Get both RSS news and company announcements with proper error handling
-            articles = []
-            company_news = []
-            
-            try:
-                articles = self.scraper.get_latest_news(hours=48) or []
-            except Exception as e:
-                logger.error(f"Error getting RSS news: {e}")
-                articles = []
-            
-            try:
-                company_news = self.company_scraper.get_company_announcements() or []
-            except Exception as e:
-                logger.error(f"Error getting company news: {e}")
-                company_news = []
-            
-            # Ensure we have lists
-            if not isinstance(articles, list):
-                articles = []
-            if not isinstance(company_news, list):
-                company_news = []
-            
-            # Combine and prioritize company announcements
-            all_news = company_news + articles
+            # Served from the shared cache; concurrent callers share one scrape
+            with span('latest_lookup'):
+                (all_news, blocks), fetched_at = await self.latest_cache.get()
             
             if not all_news:
                 await update.message.reply_text("No new AI product releases or announcements found in the last 48 hours.")
                 return
             
-            await update.message.reply_text(f"Found {len(all_news)} recent AI product releases & announcements:")
+            # Articles were rendered with the cached result; only the header,
+            # which says how old it is, is new per call
+            header = (
+                f"Found {len(all_news)} recent AI product releases & announcements "
+                f"(updated {self.format_age(fetched_at)}):"
+            )
+            payloads = pack_blocks([header] + blocks)
             
-            for article in all_news[:10]:  # Limit to 10 total
+            for payload in payloads:
                 try:
-                    message = self.scraper.format_article_message(article)
-                    await update.message.reply_text(
-                        message, 
-                        parse_mode=ParseMode.HTML,
-                        disable_web_page_preview=True
-                    )
-                    time.sleep(1)  # Avoid rate limiting
+                    with span('reply'):
+                        await update.message.reply_text(
+                            payload,
+                            parse_mode=ParseMode.HTML,
+                            disable_web_page_preview=True
+                        )
+                    MESSAGES_SENT.inc(kind='reply')
+                    await asyncio.sleep(1)  # Avoid rate limiting
                 except Exception as e:
+                    TELEGRAM_ERRORS.inc(error=type(e).__name__)
                     logger.error(f"Error sending article: {e}")
-                    # Continue with next article instead of failing completely
+                    # Continue with next message instead of failing completely
                     continue
                     
         except Exception as e:
@@ -128,6 +327,9 @@ Commands:
 /start - Subscribe to automatic updates
 /stop - Unsubscribe from updates
 /latest - Get latest AI news immediately
+/follow <topic> - Only get updates about a topic
+/unfollow <topic> - Stop following a topic (or "all")
+/topics - List followed and available topics
 /help - Show this help
 
 Sources monitored:
@@ -140,111 +342,236 @@ Updates are sent every 6 hours automatically to subscribers.
         """
         await update.message.reply_text(help_text)
     
-    async def send_updates_to_subscribers(self):
-        """Send updates to all subscribers"""
+    async def send_updates_to_subscribers(self, bot):
+        """Send updates to all subscribers
+        
+        Returns the dispatcher's stats, or None when nothing was sent.
+        """
+        # Never run two broadcasts at once
+        if self._broadcast_lock.locked():
+            logger.info("Previous broadcast still running, skipping this one")
+            return None
+        
+        async with self._broadcast_lock:
+            return await self._send_updates(bot)
+    
+    async def _send_updates(self, bot):
         if not self.subscribers:
             logger.info("No subscribers to send updates to")
-            return
+            return None
         
         try:
-            # Get articles with proper error handling
-            articles = []
-            company_news = []
-            
-            try:
-                articles = self.scraper.get_latest_news(hours=6) or []
-            except Exception as e:
-                logger.error(f"Error getting RSS news: {e}")
-                articles = []
-            
-            try:
-                company_news = self.company_scraper.get_company_announcements() or []
-            except Exception as e:
-                logger.error(f"Error getting company news: {e}")
-                company_news = []
-            
-            # Ensure we have lists
-            if not isinstance(articles, list):
-                articles = []
-            if not isinstance(company_news, list):
-                company_news = []
+            # Off the event loop: a cold store triggers a blocking first poll
+            # A broadcast covers hours of news: lead with the most relevant.
+            # Followers are routed over everything new in the window, so a
+            # topic's articles reach them even when they miss the top 10
+            window = await asyncio.to_thread(
+                self.collect_news, self.update_interval_hours, 'broadcast', by_relevance=True, limit=None
+            )
             
-            all_news = company_news + articles
-            
-            if not all_news:
+            if not window:
                 logger.info("No new articles found")
-                return
+                return None
             
+            all_news = window[:10]
             logger.info(f"Sending {len(all_news)} articles to {len(self.subscribers)} subscribers")
             
-            # Create application instance for sending messages
-            app = Application.builder().token(self.bot_token).build()
+            dispatcher = BroadcastDispatcher(
+                bot,
+                global_rate=self.broadcast_rate,
+                concurrency=self.broadcast_concurrency
+            )
+            # Routing walks every matched follower; keep it off the loop
+            groups = [
+                (articles[:10], chat_ids)
+                for articles, chat_ids in await asyncio.to_thread(self.route_topics, window)
+            ]
+            with span('broadcast'):
+                stats = await dispatcher.deliver(self._route_updates(all_news, groups))
+            # Only now is it known that these went out
+            sent = list(all_news)
+            for articles, _ in groups:
+                sent.extend(articles)
+            await asyncio.to_thread(self.mark_delivered, 'broadcast', sent)
             
-            for chat_id in self.subscribers.copy():  # Use copy to avoid modification during iteration
-                try:
-                    await app.bot.send_message(
-                        chat_id=chat_id,
-                        text=f"🚨 {len(all_news)} new AI developments found!"
-                    )
-                    
-                    for article in all_news[:10]:  # Limit to 10
-                        try:
-                            message = self.scraper.format_article_message(article)
-                            await app.bot.send_message(
-                                chat_id=chat_id,
-                                text=message,
-                                parse_mode=ParseMode.HTML,
-                                disable_web_page_preview=True
-                            )
-                            time.sleep(1)  # Rate limiting
-                        except Exception as e:
-                            logger.error(f"Error sending article to {chat_id}: {e}")
-                            continue
-                        
-                except Exception as e:
-                    logger.error(f"Error sending to {chat_id}: {e}")
-                    if "chat not found" in str(e).lower():
-                        self.subscribers.discard(chat_id)
+            for chat_id in stats['unreachable']:
+                self.subscribers.discard(chat_id)
+                self.topics.clear(chat_id)
+            return stats
                         
         except Exception as e:
             logger.error(f"Error in send_updates_to_subscribers: {e}")
+            return None
+    
+    def route_topics(self, all_news):
+        """Group topic followers by the articles they should get
+        
+        Follows may have been changed by other worker processes, so the
+        routing index is refreshed first.
+        """
+        self.topics.reload()
+        return self.topics.route(all_news, self.article_topics)
     
-    def schedule_updates(self):
-        """Schedule automatic updates"""
-        import asyncio
+    def _route_updates(self, all_news, groups):
+        """Yield (chat_id, messages) for a broadcast
+        
+        Topic followers (``groups`` from TopicIndex.route) get a digest of
+        just the articles matching their topics, rendered once per distinct
+        article set; everyone else shares the full digest. Subscribers are
+        streamed from the store in chunks.
+        """
+        rendered = {}
         
-        def run_async_update():
-            try:
-                asyncio.run(self.send_updates_to_subscribers())
-            except Exception as e:
-                logger.error(f"Error in scheduled update: {e}")
+        def format_article(article):
+            # Articles recur across topic groups; format each only once.
+            # Entries keep their article alive, so an id is never reused by
+            # one of the short-lived copies build_digest shortens titles on
+            cached = rendered.get(id(article))
+            if cached is None:
+                cached = rendered[id(article)] = (article, self.scraper.format_article_message(article))
+            return cached[1]
         
-        schedule.every(6).hours.do(run_async_update)
+        def render(articles, header):
+            with span('render'):
+                payloads = build_digest(format_article, articles, header)
+            return [
+                {'text': payload, 'parse_mode': ParseMode.HTML, 'disable_web_page_preview': True}
+                for payload in payloads
+            ]
         
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+        for articles, chat_ids in groups:
+            messages = render(articles, f"🎯 {len(articles)} new AI developments on your topics!")
+            for chat_id in chat_ids:
+                yield chat_id, messages
+        
+        messages = render(all_news, f"🚨 {len(all_news)} new AI developments found!")
+        for chat_id in self.subscribers:
+            if chat_id not in self.topics:
+                yield chat_id, messages
     
-    def run(self):
-        """Run the bot"""
-        # Create application
+    async def broadcast_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Scheduled job: broadcast using the running application's bot"""
+        await self.send_updates_to_subscribers(context.bot)
+    
+    async def ingest_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Scheduled job: poll whichever sources are due"""
+        try:
+            await asyncio.to_thread(self.pipeline.poll_due)
+            await asyncio.to_thread(self.pipeline.save_snapshot)
+        except Exception as e:
+            logger.error(f"Error in ingestion: {e}")
+    
+    async def refresh_job(self, context: ContextTypes.DEFAULT_TYPE):
+        """Scheduled job: pick up the snapshot the ingesting process wrote"""
+        try:
+            if await asyncio.to_thread(self.pipeline.reload_snapshot):
+                self.latest_cache.invalidate()
+        except Exception as e:
+            logger.error(f"Error refreshing from the snapshot: {e}")
+    
+    def schedule_updates(self, app, broadcasts=True):
+        """Schedule ingestion (or snapshot refreshes) and, if ``broadcasts``, automatic updates"""
+        if app.job_queue is None:
+            raise RuntimeError(
+                "Scheduled updates need the job queue: pip install 'python-telegram-bot[job-queue]'"
+            )
+        
+        app.job_queue.run_repeating(
+            self.ingest_job if self.ingest else self.refresh_job,
+            interval=self.ingest_tick_seconds,
+            first=0,
+            name='ingest' if self.ingest else 'refresh',
+            job_kwargs={'max_instances': 1, 'coalesce': True}
+        )
+        if not broadcasts:
+            return
+        
+        interval = timedelta(hours=self.update_interval_hours)
+        app.job_queue.run_repeating(
+            self.broadcast_job,
+            interval=interval,
+            first=interval,
+            name='broadcast',
+            job_kwargs={
+                'jitter': self.update_jitter_seconds,
+                'max_instances': 1,
+                'coalesce': True,
+            }
+        )
+    
+    def build_application(self, broadcasts=True):
+        """Create the application with all handlers and jobs registered"""
         app = Application.builder().token(self.bot_token).build()
         
         # Add handlers
         app.add_handler(CommandHandler("start", self.start_command))
         app.add_handler(CommandHandler("stop", self.stop_command))
         app.add_handler(CommandHandler("latest", self.latest_command))
+        app.add_handler(CommandHandler("follow", self.follow_command))
+        app.add_handler(CommandHandler("unfollow", self.unfollow_command))
+        app.add_handler(CommandHandler("topics", self.topics_command))
         app.add_handler(CommandHandler("help", self.help_command))
         
-        # Start scheduler in background thread
-        scheduler_thread = threading.Thread(target=self.schedule_updates, daemon=True)
-        scheduler_thread.start()
+        # Periodic work runs on the application's own event loop and bot
+        self.schedule_updates(app, broadcasts=broadcasts)
+        return app
+    
+    def close(self):
+        """Save a final snapshot, then flush and close the persistent stores"""
+        self.pipeline.save_snapshot(force=True)
+        if self.enricher is not None:
+            self.enricher.close()
+        self.subscribers.close()
+        self.topics.close()
+    
+    def run_webhook(self):
+        """Serve updates pushed by Telegram with a pool of worker processes"""
+        if not self.webhook_url:
+            raise ValueError("WEBHOOK_URL is required when BOT_MODE=webhook")
+        if self.pipeline.snapshot_path is None:
+            # Only the primary worker ingests; the others read its snapshot
+            raise ValueError("SNAPSHOT_INTERVAL can't be 0 when BOT_MODE=webhook")
+        import secrets
+        import webhook
+        
+        # The workers build their own bots; this process only receives
+        self.close()
+        logger.info(f"Bot started in webhook mode with {self.webhook_workers} workers")
+        webhook.serve(
+            self.bot_token,
+            self.webhook_url,
+            os.path.join(self.data_dir, 'updates.db'),
+            self.webhook_secret or secrets.token_urlsafe(32),
+            host=self.webhook_listen,
+            port=self.webhook_port,
+            workers=self.webhook_workers,
+            concurrency=self.webhook_concurrency
+        )
+    
+    def run(self):
+        """Run the bot"""
+        if self.bot_mode == 'webhook':
+            self.run_webhook()
+            return
+        if self.bot_mode != 'polling':
+            raise ValueError(f"Unknown BOT_MODE '{self.bot_mode}' (use polling or webhook)")
+        
+        app = self.build_application()
+        
+        metrics_server = None
+        if self.metrics_port:
+            metrics_server = MetricsServer(self.metrics_port, host=self.metrics_host).start()
         
         logger.info("Bot started successfully!")
         
         # Start the bot
-        app.run_polling(allowed_updates=Update.ALL_TYPES)
+        try:
+            app.run_polling(allowed_updates=Update.ALL_TYPES)
+        finally:
+            self.close()
+            if metrics_server is not None:
+                metrics_server.stop()
 
 if __name__ == "__main__":
     bot = AINewsBot()
-    bot.run()
\ No newline at end of file
+    bot.run()
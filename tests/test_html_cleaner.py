@@ -0,0 +1,97 @@
+"""strip_html against a fixed corpus of feed-summary snippets
+
+The expected outputs were produced by the BeautifulSoup cleaner strip_html
+replaced (html.parser tree, script/style/figure/img decomposed, get_text()
+and the same whitespace cleanup), so these cases pin down that the two
+agree now that bs4 is no longer a dependency.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_cleaner import HTMLCleaner, strip_html  # noqa: E402
+
+CASES = [
+    ('Plain text summary with no markup at all',
+     'Plain text summary with no markup at all'),
+    ('  Leading and   trailing   whitespace  \n\n  over lines  ',
+     'Leading and trailing whitespace over lines'),
+    ('<p>OpenAI releases <b>GPT-5</b> with <a href="https://openai.com">new tools</a>.</p>',
+     'OpenAI releases GPT-5 with new tools.'),
+    ('<p>First paragraph.</p>\n<p>Second paragraph.</p>',
+     'First paragraph. Second paragraph.'),
+    ('AT&amp;T partners with &lt;Anthropic&gt; on &quot;safe&quot; AI &mdash; again',
+     'AT&T partners with <Anthropic> on "safe" AI — again'),
+    ('Bare ampersand: R&D spending & growth',
+     'Bare ampersand: R&D spending & growth'),
+    ('Unknown entity &notanentity; and legacy &copy 2024 and &ampx',
+     'Unknown entity &notanentity and legacy © 2024 and &ampx'),
+    ('Numeric refs: &#8220;quoted&#8221; &#x2014; &#150; &#x80;&#8364;',
+     'Numeric refs: “quoted” — – €€'),
+    ('<div><script>var x = "<p>hidden</p>";</script>Visible text</div>',
+     'Visible text'),
+    ('<style>p { color: red; }</style><p>Styled paragraph</p>',
+     'Styled paragraph'),
+    ('<figure><img src="a.png"><figcaption>Caption is dropped</figcaption></figure><p>Body kept</p>',
+     'Body kept'),
+    ('Before<img src="x.png" alt="alt text">After',
+     'BeforeAfter'),
+    ('Line one<br>Line two<br/>Line three',
+     'Line oneLine twoLine three'),
+    ('<!-- a comment --><p>After comment</p>',
+     'After comment'),
+    ('<![CDATA[Raw <b>cdata</b> content]]> and text',
+     'Raw <b>cdata</b> content and text'),
+    ('<pre>  keep   this\n   spacing  </pre> outside   text',
+     'keep this spacing outside text'),
+    ('<ul><li>One</li>\n<li>Two</li>\n<li>Three</li></ul>',
+     'One Two Three'),
+    ('<p>Unclosed paragraph <b>bold <i>italic</p> tail',
+     'Unclosed paragraph bold italic tail'),
+    ('<table><tr><td>Cell A</td><td>Cell B</td></tr></table>',
+     'Cell ACell B'),
+    ('<p>Ruby <ruby>漢<rt>kan</rt>字<rt>ji</rt></ruby> text</p>',
+     'Ruby 漢字 text'),
+    ('<p>Template <template>hidden template</template> shown</p>',
+     'Template shown'),
+    ('<p>Non-breaking&nbsp;space and&#160;more</p>',
+     'Non-breaking\xa0space and\xa0more'),
+    ('<p>Emoji 🤖 and accents: café, naïve, Zürich</p>',
+     'Emoji 🤖 and accents: café, naïve, Zürich'),
+    ('<p>Double  spaces  split  phrases</p>',
+     'Double spaces split phrases'),
+    ('<?xml version="1.0"?><p>Processing instruction</p>',
+     'Processing instruction'),
+    ('<!DOCTYPE html><html><body><p>Full document</p></body></html>',
+     'Full document'),
+    ('Text with a stray < sign and a > sign',
+     'Text with a stray < sign and a > sign'),
+    ('<p>Nested <span><span><span>deeply</span></span></span> nested</p>',
+     'Nested deeply nested'),
+    ('<img src="only-image.png">',
+     ''),
+    ('<script>only script</script>',
+     ''),
+    ('',
+     ''),
+]
+
+
+@pytest.mark.parametrize('snippet, expected', CASES)
+def test_strip_html_matches_beautifulsoup(snippet, expected):
+    assert strip_html(snippet) == expected
+
+
+def test_cleaner_caches_by_content():
+    cleaner = HTMLCleaner(maxsize=2)
+    assert cleaner.clean('<p>One</p>') == 'One'
+    assert cleaner.clean('<p>One</p>') == 'One'
+    assert (cleaner.hits, cleaner.misses) == (1, 1)
+
+    cleaner.clean('<p>Two</p>')
+    cleaner.clean('<p>Three</p>')  # Evicts "One", the least recently used
+    assert cleaner.clean('<p>One</p>') == 'One'
+    assert (cleaner.hits, cleaner.misses) == (1, 4)
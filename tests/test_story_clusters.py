@@ -0,0 +1,96 @@
+"""Story clustering: cross-outlet duplicates fold, distinct stories don't"""
+import os
+import sys
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from article_store import ArticleStore  # noqa: E402
+from date_utils import utc_now  # noqa: E402
+
+ROLLOUT = (
+    "OpenAI said the new release rolls out to ChatGPT Plus and Pro subscribers "
+    "starting today, with free users to follow."
+)
+BLACKWELL = (
+    "Nvidia unveils Blackwell Ultra GPUs at GTC 2025 keynote",
+    "Jensen Huang announced Blackwell Ultra, shipping in the second half of the year, "
+    "along with the Vera Rubin roadmap.",
+)
+BLACKWELL_REWRITE = (
+    "At GTC 2025, Nvidia unveils Blackwell Ultra GPUs for AI data centers",
+    "Nvidia CEO Jensen Huang said Blackwell Ultra ships in the second half of the year; "
+    "Vera Rubin follows next year.",
+)
+
+
+def article(title, summary, link, source_id, hours_ago=0, keywords=()):
+    return {
+        'title': title,
+        'summary': summary,
+        'link': link,
+        'source': source_id,
+        'source_id': source_id,
+        'published_at': utc_now() - timedelta(hours=hours_ago),
+        'keywords': list(keywords),
+    }
+
+
+def test_distinct_launches_from_one_company_stay_separate():
+    store = ArticleStore()
+    store.add([
+        article("OpenAI launches GPT-5 for ChatGPT users", ROLLOUT, 'https://a.example/gpt-5', 'techcrunch_ai'),
+        article("OpenAI launches Sora video app for ChatGPT users", ROLLOUT, 'https://b.example/sora', 'the_verge_ai'),
+    ])
+    assert 'https://a.example/gpt-5' in store
+    assert 'https://b.example/sora' in store
+
+
+def test_same_story_from_another_outlet_folds_in():
+    store = ArticleStore()
+    first = article(*BLACKWELL, 'https://a.example/blackwell', 'techcrunch_ai', keywords=['nvidia'])
+    store.add([
+        first,
+        article(*BLACKWELL_REWRITE, 'https://b.example/blackwell', 'the_verge_ai', keywords=['gpu']),
+    ])
+    assert len(store) == 1
+    assert first['alternates'] == [{'source': 'the_verge_ai', 'link': 'https://b.example/blackwell'}]
+    assert first['keywords'] == ['nvidia', 'gpu']
+
+
+def test_follow_up_from_the_same_source_stays_separate():
+    store = ArticleStore()
+    store.add([
+        article(*BLACKWELL, 'https://a.example/blackwell', 'techcrunch_ai'),
+        article(*BLACKWELL_REWRITE, 'https://a.example/blackwell-update', 'techcrunch_ai'),
+    ])
+    assert len(store) == 2
+
+
+def test_stories_days_apart_stay_separate():
+    store = ArticleStore()
+    store.add([
+        article(*BLACKWELL, 'https://a.example/blackwell', 'techcrunch_ai', hours_ago=72),
+        article(*BLACKWELL_REWRITE, 'https://b.example/blackwell', 'the_verge_ai'),
+    ])
+    assert len(store) == 2
+
+
+def test_short_stories_are_not_clustered():
+    store = ArticleStore()
+    store.add([
+        article("OpenAI ships update", "", 'https://a.example/update', 'techcrunch_ai'),
+        article("OpenAI ships update", "", 'https://b.example/update', 'the_verge_ai'),
+    ])
+    assert len(store) == 2
+
+
+def test_merged_keywords_rerank_the_representative():
+    store = ArticleStore()
+    first = article(*BLACKWELL, 'https://a.example/blackwell', 'techcrunch_ai', keywords=['nvidia'])
+    other = article("Anthropic ships Claude agents for coding teams", ROLLOUT,
+                    'https://c.example/claude', 'wired_ai', keywords=['anthropic', 'agents'])
+    store.add([first, other])
+    assert store.most_relevant(24, limit=1) == [other]
+    store.add([article(*BLACKWELL_REWRITE, 'https://b.example/blackwell', 'the_verge_ai', keywords=['gpu', 'blackwell'])])
+    assert store.most_relevant(24) == [first, other]
@@ -0,0 +1,129 @@
+import logging
+import os
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class TopicIndex:
+    """Topics followed by each chat, with an inverted index topic -> chats
+
+    Follows live in a ``follows`` table (usually in the subscribers database)
+    and are mirrored in memory both ways: topic to chats for routing, chat to
+    topics for /topics and /unfollow. Routing a batch of articles touches only
+    the followers of the topics those articles matched, never the whole
+    subscriber list.
+
+    Follow changes are rare, so they are written through immediately. The
+    database is the source of truth for per-chat answers, so several
+    processes can share it; ``reload`` brings the routing index up to date
+    with follows made elsewhere.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS follows ('
+            'chat_id INTEGER NOT NULL, term TEXT NOT NULL, '
+            'PRIMARY KEY (chat_id, term)) WITHOUT ROWID'
+        )
+
+        self._followers = {}  # term -> set of chat IDs
+        self._topics = {}     # chat ID -> set of terms
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """Rebuild the in-memory index from the database"""
+        followers = {}
+        topics = {}
+        with self._lock:
+            for chat_id, term in self._conn.execute('SELECT chat_id, term FROM follows'):
+                followers.setdefault(term, set()).add(chat_id)
+                topics.setdefault(chat_id, set()).add(term)
+            self._followers = followers
+            self._topics = topics
+
+    def follow(self, chat_id, term):
+        """Follow a topic; returns False if the chat already followed it"""
+        with self._lock:
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO follows (chat_id, term) VALUES (?, ?)', (chat_id, term)
+            )
+            self._followers.setdefault(term, set()).add(chat_id)
+            self._topics.setdefault(chat_id, set()).add(term)
+            return cursor.rowcount == 1
+
+    def unfollow(self, chat_id, term):
+        """Stop following a topic; returns False if it wasn't followed"""
+        with self._lock:
+            cursor = self._conn.execute(
+                'DELETE FROM follows WHERE chat_id = ? AND term = ?', (chat_id, term)
+            )
+            self._forget(chat_id, term)
+            return cursor.rowcount == 1
+
+    def clear(self, chat_id):
+        """Drop every follow of a chat; returns how many there were"""
+        with self._lock:
+            cursor = self._conn.execute('DELETE FROM follows WHERE chat_id = ?', (chat_id,))
+            for term in list(self._topics.get(chat_id, ())):
+                self._forget(chat_id, term)
+            return cursor.rowcount
+
+    def _forget(self, chat_id, term):
+        followers = self._followers.get(term)
+        if followers is not None:
+            followers.discard(chat_id)
+            if not followers:
+                del self._followers[term]
+        terms = self._topics.get(chat_id)
+        if terms is not None:
+            terms.discard(term)
+            if not terms:
+                del self._topics[chat_id]
+
+    def topics(self, chat_id):
+        """Sorted topics a chat follows"""
+        with self._lock:
+            rows = self._conn.execute('SELECT term FROM follows WHERE chat_id = ?', (chat_id,)).fetchall()
+        return sorted(row[0] for row in rows)
+
+    def __contains__(self, chat_id):
+        """Whether a chat follows any topic (and so gets a routed digest)"""
+        return chat_id in self._topics
+
+    def route(self, articles, terms_of):
+        """Group following chats by the articles that match their topics
+
+        ``terms_of(article)`` gives the topics an article matched. Returns a
+        list of ``(articles, chat_ids)`` groups: every chat in a group gets
+        exactly those articles, in their original order, so a digest can be
+        rendered once per group. Chats matching nothing are left out. Cost is
+        proportional to the deliveries made, not to the number of followers.
+        """
+        matched = {}  # chat ID -> indices of its articles
+        with self._lock:
+            for index, article in enumerate(articles):
+                audience = set()
+                for term in terms_of(article):
+                    followers = self._followers.get(term)
+                    if followers:
+                        audience |= followers
+                for chat_id in audience:
+                    matched.setdefault(chat_id, []).append(index)
+
+        groups = {}
+        for chat_id, indices in matched.items():
+            groups.setdefault(tuple(indices), []).append(chat_id)
+        return [([articles[index] for index in key], chat_ids) for key, chat_ids in groups.items()]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
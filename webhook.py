@@ -0,0 +1,338 @@
+"""Webhook serving mode: an HTTP receiver feeding a pool of worker processes
+
+Telegram POSTs each update to the receiver, which stores it in a SQLite
+work queue and answers at once. Worker processes claim updates from the
+queue and run them through their own Application, so command handling is
+spread over several cores and one slow /latest never holds up another
+chat's /start or /stop.
+
+Updates of the same chat are handed out one at a time and in order; a
+claim that is not acknowledged within ``claim_timeout`` seconds (the worker
+died) is handed out again.
+"""
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from telegram import Bot, Update
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+def chat_id_of(data):
+    """Chat an update belongs to, or None (inline queries, polls, ...)"""
+    for value in data.values():
+        if isinstance(value, dict):
+            chat = value.get('chat') or (value.get('message') or {}).get('chat')
+            if chat:
+                return chat.get('id')
+    return None
+
+
+class UpdateQueue:
+    """Durable queue of raw updates shared by the receiver and the workers
+
+    One row per update, keyed by ``update_id`` so a redelivery from Telegram
+    is stored once. ``claim`` marks the oldest update a worker may take;
+    ``ack`` removes it once handled.
+    """
+
+    def __init__(self, path, claim_timeout=600):
+        self.path = path
+        self.claim_timeout = claim_timeout
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS updates ('
+            'update_id INTEGER PRIMARY KEY, chat_id INTEGER, payload TEXT NOT NULL, '
+            'claimed_by TEXT, claimed_at REAL)'
+        )
+        self._lock = threading.Lock()
+
+    def put(self, data):
+        """Store a decoded update; returns False if it was already queued"""
+        with self._lock:
+            cursor = self._conn.execute(
+                'INSERT OR IGNORE INTO updates (update_id, chat_id, payload) VALUES (?, ?, ?)',
+                (data['update_id'], chat_id_of(data), json.dumps(data))
+            )
+        return cursor.rowcount == 1
+
+    def claim(self, worker):
+        """Take the oldest available update: ``(update_id, data)`` or None
+
+        An update is available unless it is claimed already, or an earlier
+        update of its chat is still being handled.
+        """
+        stale = time.time() - self.claim_timeout
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._conn.execute(
+                    'SELECT update_id, payload FROM updates '
+                    'WHERE (claimed_by IS NULL OR claimed_at < :stale) '
+                    'AND (chat_id IS NULL OR chat_id NOT IN ('
+                    '  SELECT chat_id FROM updates '
+                    '  WHERE claimed_by IS NOT NULL AND claimed_at >= :stale AND chat_id IS NOT NULL)) '
+                    'ORDER BY update_id LIMIT 1',
+                    {'stale': stale}
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        'UPDATE updates SET claimed_by = ?, claimed_at = ? WHERE update_id = ?',
+                        (worker, time.time(), row[0])
+                    )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def ack(self, update_id):
+        """Forget a handled update"""
+        with self._lock:
+            self._conn.execute('DELETE FROM updates WHERE update_id = ?', (update_id,))
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM updates').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class WebhookReceiver:
+    """Accepts Telegram's webhook POSTs and queues them, from a thread pool
+
+    Requests to any other path, or without the secret token Telegram was
+    given in setWebhook, are refused.
+    """
+
+    def __init__(self, queue, url_path, secret_token, host='0.0.0.0', port=8443):
+        url_path = '/' + url_path.strip('/')
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status):
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_POST(self):
+                if self.path.split('?', 1)[0].rstrip('/') != url_path.rstrip('/'):
+                    self._reply(404)
+                    return
+                if self.headers.get(SECRET_HEADER) != secret_token:
+                    self._reply(403)
+                    return
+                try:
+                    body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                    data = json.loads(body)
+                    queue.put(data)
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Rejected malformed update: {e}")
+                    self._reply(400)
+                    return
+                except Exception as e:
+                    # Telegram retries anything but a 2xx, so the update isn't lost
+                    logger.error(f"Error queueing update: {e}")
+                    self._reply(500)
+                    return
+                self._reply(200)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='webhook', daemon=True)
+        self._thread.start()
+        logger.info(f"Webhook receiver listening on {self.httpd.server_address[0]}:{self.port}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class UpdateWorker:
+    """Drains the queue into one process's Application
+
+    Up to ``concurrency`` updates are handled at a time. Subscriber changes
+    are flushed before an update is acknowledged, so the next update of the
+    same chat sees them whichever process gets it.
+    """
+
+    def __init__(self, news_bot, app, queue, name, concurrency=8, idle_poll=(0.05, 0.5)):
+        self.news_bot = news_bot
+        self.app = app
+        self.queue = queue
+        self.name = name
+        self.concurrency = concurrency
+        self.min_poll, self.max_poll = idle_poll
+
+    async def _handle(self, update_id, data, slots):
+        try:
+            await self.app.process_update(Update.de_json(data, self.app.bot))
+        except Exception as e:
+            logger.error(f"Error processing update {update_id}: {e}")
+        finally:
+            # Acknowledged even on failure: a poison update must not loop
+            try:
+                await asyncio.to_thread(self.news_bot.subscribers.flush)
+                await asyncio.to_thread(self.queue.ack, update_id)
+            finally:
+                slots.release()
+
+    async def run(self, stop):
+        """Handle updates until ``stop`` is set, then finish those in flight"""
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        idle = self.min_poll
+
+        async with self.app:
+            await self.app.start()
+            try:
+                while not stop.is_set():
+                    await slots.acquire()
+                    try:
+                        claimed = await asyncio.to_thread(self.queue.claim, self.name)
+                    except Exception as e:
+                        logger.error(f"Error claiming an update: {e}")
+                        claimed = None
+                    if claimed is None:
+                        slots.release()
+                        try:
+                            await asyncio.wait_for(stop.wait(), idle)
+                        except asyncio.TimeoutError:
+                            pass
+                        idle = min(idle * 2, self.max_poll)
+                        continue
+
+                    idle = self.min_poll
+                    task = asyncio.create_task(self._handle(*claimed, slots))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+                if tasks:
+                    await asyncio.gather(*tasks, return_exceptions=True)
+            finally:
+                await self.app.stop()
+
+
+def run_worker(name, queue_path, primary, concurrency):
+    """Worker process entry point
+
+    Only the primary worker ingests (and enriches), writes the snapshot,
+    sends the scheduled broadcasts and serves metrics. The others answer
+    from the primary's snapshot, reloading it whenever it is rewritten.
+    """
+    from telegram_bot import AINewsBot
+    from metrics import MetricsServer
+
+    news_bot = AINewsBot(ingest=primary)
+    app = news_bot.build_application(broadcasts=primary)
+    queue = UpdateQueue(queue_path)
+
+    metrics_server = None
+    if primary and news_bot.metrics_port:
+        metrics_server = MetricsServer(news_bot.metrics_port, host=news_bot.metrics_host).start()
+
+    async def main():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        worker = UpdateWorker(news_bot, app, queue, name, concurrency=concurrency)
+        await worker.run(stop)
+
+    try:
+        logger.info(f"Worker {name} started{' (primary)' if primary else ''}")
+        asyncio.run(main())
+    finally:
+        queue.close()
+        news_bot.close()
+        if metrics_server is not None:
+            metrics_server.stop()
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+async def set_webhook(token, url, secret_token):
+    async with Bot(token) as bot:
+        await bot.set_webhook(url=url, secret_token=secret_token, allowed_updates=Update.ALL_TYPES)
+
+
+def serve(token, webhook_url, queue_path, secret_token, host='0.0.0.0', port=8443,
+          workers=2, concurrency=8, register=True):
+    """Run the receiver and supervise ``workers`` worker processes
+
+    Blocks until interrupted. Workers that die are started again; worker 0
+    is always the primary. ``register=False`` skips setWebhook, for when the
+    webhook is managed elsewhere.
+    """
+    queue = UpdateQueue(queue_path)
+    path = webhook_url.split('://', 1)[-1].partition('/')[2]
+    receiver = WebhookReceiver(queue, path, secret_token, host=host, port=port).start()
+
+    # Spawned, not forked: workers must not inherit the receiver's threads
+    context = multiprocessing.get_context('spawn')
+
+    def start_worker(index):
+        process = context.Process(
+            target=run_worker,
+            args=(f'worker-{index}', queue_path, index == 0, concurrency),
+            name=f'worker-{index}',
+            daemon=True
+        )
+        process.start()
+        return process
+
+    processes = [start_worker(index) for index in range(max(1, workers))]
+    signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        if register:
+            asyncio.run(set_webhook(token, webhook_url, secret_token))
+            logger.info(f"Webhook set to {webhook_url}")
+
+        while True:
+            time.sleep(1)
+            for index, process in enumerate(processes):
+                if not process.is_alive():
+                    logger.warning(f"{process.name} exited with code {process.exitcode}, restarting")
+                    processes[index] = start_worker(index)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        receiver.stop()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join(timeout=30)
+        logger.info(f"Webhook mode stopped with {len(queue)} updates still queued")
+        queue.close()